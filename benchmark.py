@@ -0,0 +1,223 @@
+"""Measure frame times of scripted scenarios, without a window.
+
+Every scenario boots a fresh Level on the SDL dummy driver, plays its script
+and reports p50, p95 and p99 of each profiled part of the frame. Run it from
+this folder, like main.py, and compare the JSON files between commits.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+from time import perf_counter
+
+import pygame
+
+from helpers.profiler import profiler
+from helpers.replay import keyboard
+from helpers.settings import *
+from helpers.support import grid_to_tile
+from map.level import Level
+from map.soil_grid import FARMABLE, TILLED
+from ui.profiler import cache_stats
+
+TICK = 1 / SIMULATION_RATE
+
+
+class ScriptedKeys:
+    """key source of the keyboard, holding down the keys of the script"""
+
+    def __init__(self) -> None:
+        self.held = set()
+
+    def __call__(self):
+        return self
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+class Benchmark:
+    """runs the scenarios on fresh levels
+
+    Args:
+        frames: number of frames each scenario runs for
+        seed: seed of the random rolls, so runs are comparable
+    """
+
+    def __init__(self, frames, seed) -> None:
+        self.frames = frames
+        self.seed = seed
+        self.keys = ScriptedKeys()
+        keyboard.source = self.keys
+        self.level = None
+
+    def boot(self):
+        """start a fresh level"""
+        random.seed(self.seed)
+        self.keys.held.clear()
+        self.level = Level()
+        profiler.reset()
+
+    def run(self, frames, keys=()):
+        """play frames, one simulation tick each, and time them
+
+        Args:
+            frames: number of frames
+            keys: keys held down meanwhile
+        """
+        self.keys.held = set(keys)
+        for _ in range(frames):
+            start = perf_counter()
+            pygame.event.pump()
+            self.level.update(TICK)
+            self.level.draw(1)
+            pygame.display.update()
+            profiler.record("frame", perf_counter() - start)
+
+    def place_player(self, pos):
+        """move the player somewhere on the map
+
+        Args:
+            pos: new center of the player
+        """
+        player = self.level.player
+        player.pos = pygame.math.Vector2(pos)
+        player.hitbox.center = player.rect.center = pos
+
+    def fill_farm(self):
+        """till, water and plant every farmable cell and put the player in the middle of the farm"""
+        soil_layer = self.level.soil_layer
+        farmable = soil_layer.grid.mask(FARMABLE)
+        cells = list(soil_layer.grid.cells(farmable))
+        soil_layer.grid.set_mask(TILLED, farmable)
+        soil_layer.retile_all()
+        soil_layer.water_all()
+        for x, y in cells:
+            point = grid_to_tile((x + 0.5, y + 0.5))
+            soil_layer.plant_seed(point, "corn" if x % 2 else "tomato")
+
+        middle_x = sum(x for x, _ in cells) / len(cells)
+        middle_y = sum(y for _, y in cells) / len(cells)
+        self.place_player(grid_to_tile((round(middle_x), round(middle_y))))
+
+    def idle(self):
+        """stand still"""
+        self.run(self.frames)
+
+    def walk(self):
+        """walk around in a square"""
+        keys = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+        for key in keys:
+            self.run(self.frames // 4, [key])
+
+    def farm(self):
+        """stand in the middle of a fully planted and watered farm"""
+        self.fill_farm()
+        profiler.reset()
+        self.run(self.frames)
+
+    def rain(self):
+        """stand in the rain"""
+        self.level.raining = True
+        self.run(self.frames)
+
+    def shop(self):
+        """keep the shop menu open"""
+        self.level.shop_active = True
+        self.run(self.frames)
+
+    def sleep(self):
+        """sleep through the night with a full farm to reset"""
+        self.fill_farm()
+        profiler.reset()
+        self.level.player.sleep = True
+        frames = 0
+        while self.level.player.sleep and frames < self.frames * 10:
+            self.run(1)
+            frames += 1
+
+    SCENARIOS = ("idle", "walk", "farm", "rain", "shop", "sleep")
+
+    def scenario(self, name):
+        """run one scenario on a fresh level
+
+        Args:
+            name: name of the scenario
+
+        Returns:
+            dict: timings of the profiled parts of the frame
+        """
+        self.boot()
+        getattr(self, name)()
+        return profiler.summary()
+
+
+def commit():
+    """get the current commit, if this is a git checkout
+
+    Returns:
+        str: short hash of the commit, or None
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"scenarios to run, all by default: {', '.join(Benchmark.SCENARIOS)}",
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in Benchmark.SCENARIOS:
+            parser.error(f"unknown scenario {name}")
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    profiler.enabled = profiler.keep_samples = True
+    benchmark = Benchmark(args.frames, args.seed)
+
+    results = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "frames": args.frames,
+        "seed": args.seed,
+        "scenarios": {},
+    }
+    for name in args.scenarios or Benchmark.SCENARIOS:
+        timings = benchmark.scenario(name)
+        results["scenarios"][name] = timings
+        frame = timings["frame"]
+        print(
+            f"{name:6} frame p50 {frame['p50']:.2f} ms, "
+            f"p95 {frame['p95']:.2f} ms, p99 {frame['p99']:.2f} ms"
+        )
+
+    # counted over all scenarios, the caches are shared between the levels
+    results["caches"] = cache_stats()
+    for name, stats in results["caches"].items():
+        print(f"{name} hits {stats['hits']}, misses {stats['misses']}")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results written to {args.output}")
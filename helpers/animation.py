@@ -0,0 +1,94 @@
+class AnimationClock:
+    """frame counter of a looping animation
+
+    Args:
+        speed: frames per second, or per call if the caller advances by 1
+    """
+
+    def __init__(self, speed) -> None:
+        self.speed = speed
+        self.frame_index = 0
+
+    def advance(self, dt, length):
+        """move the clock forward, starting over after the last frame
+
+        Args:
+            dt: delta time
+            length: number of frames of the animation
+
+        Returns:
+            bool: True if the animation went past its last frame
+        """
+        self.frame_index += self.speed * dt
+        if self.frame_index >= length:
+            self.frame_index = 0
+            return True
+        return False
+
+    def reset(self):
+        """start the animation from the first frame"""
+        self.frame_index = 0
+
+    def frame(self, frames):
+        """get the current frame
+
+        Args:
+            frames: frames of the animation
+
+        Returns:
+            pygame.Surface: frame to show
+        """
+        return frames[int(self.frame_index)]
+
+
+class SharedClip:
+    """animation that all its sprites play in sync
+
+    Sprites read the current frame from the clip, so however many sprites
+    play it, only the clip is updated.
+    """
+
+    def __init__(self, frames, speed) -> None:
+        self.frames = frames
+        self.clock = AnimationClock(speed)
+        self.image = frames[0]
+
+    def update(self, dt):
+        """advance the clip
+
+        Args:
+            dt: delta time
+        """
+        self.clock.advance(dt, len(self.frames))
+        self.image = self.clock.frame(self.frames)
+
+
+class Animations:
+    """shared clips of a level, updated once per tick"""
+
+    def __init__(self) -> None:
+        self.clips = {}
+
+    def clip(self, name, frames, speed):
+        """get a shared clip, creating it on first use
+
+        Args:
+            name: name of the clip
+            frames: frames of the clip
+            speed: frames per second
+
+        Returns:
+            SharedClip: the clip
+        """
+        if name not in self.clips:
+            self.clips[name] = SharedClip(frames, speed)
+        return self.clips[name]
+
+    def update(self, dt):
+        """advance all clips
+
+        Args:
+            dt: delta time
+        """
+        for clip in self.clips.values():
+            clip.update(dt)
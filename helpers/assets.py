@@ -0,0 +1,77 @@
+from os.path import normpath
+
+import pygame
+
+from .support import import_folder
+
+
+class AssetRegistry:
+    """shared cache for images, every file is loaded and converted only once"""
+
+    def __init__(self) -> None:
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, load):
+        """get a cached asset, or load and cache it
+
+        Args:
+            key: key of the asset in the cache
+            load: function that loads the asset
+
+        Returns:
+            the cached asset
+        """
+        if key in self.surfaces:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.surfaces[key] = load()
+        return self.surfaces[key]
+
+    def image(self, path):
+        """load a single image
+
+        Args:
+            path: path to the image
+
+        Returns:
+            pygame.Surface: shared surface, do not draw on it
+        """
+        path = normpath(path)
+        return self.get(
+            ("image", path),
+            lambda: pygame.image.load(path).convert_alpha(),
+        )
+
+    def folder(self, path, return_type="list"):
+        """load a folder of images with import_folder
+
+        Args:
+            path: path to folder with images
+            return_type: dict or list, defaults to "list".
+
+        Returns:
+            list or dict: shared surfaces, do not modify the container
+        """
+        path = normpath(path)
+        return self.get(
+            ("folder", path, return_type),
+            lambda: import_folder(path, return_type),
+        )
+
+    def stats(self):
+        """get the cache statistics
+
+        Returns:
+            dict: hit and miss counts and number of cached assets
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self.surfaces),
+        }
+
+
+assets = AssetRegistry()
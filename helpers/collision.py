@@ -0,0 +1,48 @@
+from math import inf
+
+
+def axis_times(start, end, low, high, step):
+    """entry and exit time of a moving interval along one axis
+
+    Args:
+        start: low edge of the moving interval
+        end: high edge of the moving interval
+        low: low edge of the obstacle
+        high: high edge of the obstacle
+        step: distance the interval moves
+
+    Returns:
+        tuple: entry and exit time, infinite when the interval does not move
+    """
+    if step > 0:
+        return (low - end) / step, (high - start) / step
+    if step < 0:
+        return (high - start) / step, (low - end) / step
+    if end <= low or start >= high:
+        return inf, -inf  # never overlaps
+    return -inf, inf  # always overlaps
+
+
+def time_of_impact(rect, dx, dy, obstacle):
+    """swept AABB test, when does a moving rect first touch an obstacle
+
+    Args:
+        rect: rect at the start of the movement
+        dx: movement in the x direction
+        dy: movement in the y direction
+        obstacle: rect of the obstacle
+
+    Returns:
+        float: fraction of the movement (0 to 1) at the impact, or None,
+        rects that already overlap are left to the regular collision
+    """
+    x_entry, x_exit = axis_times(
+        rect.left, rect.right, obstacle.left, obstacle.right, dx
+    )
+    y_entry, y_exit = axis_times(
+        rect.top, rect.bottom, obstacle.top, obstacle.bottom, dy
+    )
+    entry = max(x_entry, y_entry)
+    if entry >= min(x_exit, y_exit) or not 0 <= entry <= 1:
+        return None
+    return entry
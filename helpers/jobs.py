@@ -0,0 +1,45 @@
+def finish(steps):
+    """run all steps of a job at once
+
+    Args:
+        steps: iterator that does a piece of work per step
+    """
+    for _ in steps:
+        pass
+
+
+class SlicedJob:
+    """job that is spread over several ticks, running a fixed number of steps each tick
+
+    The budget is counted in steps and not in seconds, so the tick the job
+    ends on does not depend on the speed of the machine and replays stay exact.
+
+    Args:
+        steps: iterator that does a small piece of work per step
+    """
+
+    def __init__(self, steps) -> None:
+        self.steps = iter(steps)
+        self.done = False
+
+    def run(self, budget):
+        """run steps until the job is done or the budget is used up
+
+        At least one step runs every call, so the job always gets done.
+
+        Args:
+            budget: number of steps to run
+
+        Returns:
+            bool: True if the job is done
+        """
+        for count, _ in enumerate(self.steps, 1):
+            if count >= budget:
+                return False
+        self.done = True
+        return True
+
+    def finish(self):
+        """run the rest of the job at once"""
+        finish(self.steps)
+        self.done = True
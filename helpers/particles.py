@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class ParticlePool:
+    """fixed number of particles kept in numpy arrays, drawn with a single blits call
+
+    Particles live in slots of the arrays, a dead slot is reused by the next
+    spawn, so nothing is allocated or garbage-collected while they move.
+    """
+
+    def __init__(self, size, surfs) -> None:
+        self.surfs = surfs
+        self.pos = np.zeros((size, 2), dtype=np.float32)
+        self.previous = np.zeros((size, 2), dtype=np.float32)
+        self.velocity = np.zeros((size, 2), dtype=np.float32)
+        self.step = np.zeros((size, 2), dtype=np.float32)
+        self.age = np.zeros(size, dtype=np.float32)
+        self.lifetime = np.zeros(size, dtype=np.float32)
+        self.frame = np.zeros(size, dtype=np.intp)
+        self.alive = np.zeros(size, dtype=bool)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def spawn(self, pos, velocity, lifetime, frame):
+        """start new particles in free slots, particles that do not fit are dropped
+
+        Args:
+            pos: array of top left positions, one row per particle
+            velocity: array of velocities in pixels per second
+            lifetime: array of lifetimes in seconds
+            frame: array of indices into the surfaces of the pool
+
+        Returns:
+            int: number of particles that were spawned
+        """
+        free = np.flatnonzero(~self.alive)[: len(pos)]
+        count = len(free)
+        self.pos[free] = pos[:count]
+        self.previous[free] = pos[:count]
+        self.velocity[free] = velocity[:count]
+        self.lifetime[free] = lifetime[:count]
+        self.frame[free] = frame[:count]
+        self.age[free] = 0
+        self.alive[free] = True
+        return count
+
+    def update(self, dt):
+        """move the particles and retire the ones that outlived their lifetime
+
+        Args:
+            dt: delta time
+        """
+        np.copyto(self.previous, self.pos)
+        np.multiply(self.velocity, dt, out=self.step)
+        self.pos += self.step
+        self.age += dt
+        self.alive &= self.age < self.lifetime
+
+    def clear(self):
+        """kill all particles"""
+        self.alive[:] = False
+
+    def draw(self, surface, offset, alpha=1):
+        """draw the living particles
+
+        Args:
+            surface: surface to draw on
+            offset: camera offset
+            alpha: how far the frame is between the last two simulation ticks, from 0 to 1
+        """
+        slots = np.flatnonzero(self.alive)
+        if not len(slots):
+            return
+        previous = self.previous[slots]
+        pos = previous + (self.pos[slots] - previous) * alpha
+        pos -= (offset.x, offset.y)
+        surfs = self.surfs
+        surface.blits(
+            [
+                (surfs[frame], topleft)
+                for frame, topleft in zip(
+                    self.frame[slots].tolist(),
+                    np.rint(pos).astype(int).tolist(),
+                )
+            ],
+            doreturn=False,
+        )
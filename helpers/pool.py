@@ -0,0 +1,74 @@
+from helpers.settings import *
+
+
+class SpritePool:
+    """keeps killed sprites of one class around, so new ones reuse them instead of being allocated
+
+    Args:
+        cls: sprite class, it has to mix in Poolable
+        limit: most sprites kept for reuse
+    """
+
+    def __init__(self, cls, limit=SPRITE_POOL_LIMIT) -> None:
+        self.cls = cls
+        self.limit = limit
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, *args, **kwargs):
+        """get a sprite, reusing a released one if there is any
+
+        Args:
+            args, kwargs: arguments of the sprite class
+
+        Returns:
+            pygame.sprite.Sprite: initialised sprite, added to its groups
+        """
+        if self.free:
+            sprite = self.free.pop()
+            self.hits += 1
+            # a released sprite is in no groups, init sets position, image and groups again
+            sprite.__init__(*args, **kwargs)
+        else:
+            sprite = self.cls(*args, **kwargs)
+            self.misses += 1
+        sprite.pool = self
+        sprite.released = False
+        return sprite
+
+    def release(self, sprite):
+        """take back a killed sprite
+
+        Args:
+            sprite: sprite to keep for reuse
+        """
+        if sprite.released or len(self.free) >= self.limit:
+            return
+        sprite.released = True
+        self.free.append(sprite)
+
+    def stats(self):
+        """get the pool counters
+
+        Returns:
+            dict: hits, misses and number of free sprites
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "free": len(self.free),
+        }
+
+
+class Poolable:
+    """mixin for sprites that go back to their pool when killed"""
+
+    pool = None
+    released = False
+
+    def kill(self):
+        """remove the sprite from all groups and return it to its pool"""
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
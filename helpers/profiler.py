@@ -0,0 +1,99 @@
+from collections import defaultdict
+from contextlib import nullcontext
+from time import perf_counter
+
+import numpy as np
+
+NO_SECTION = nullcontext()
+
+
+class Section:
+    """times one run of a named part of the frame"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """collects how long the parts of each frame take, it costs nothing while disabled
+
+    The time of every part is summed up per frame, every single timing is
+    only kept while keep_samples is set, for the percentiles of a benchmark.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.keep_samples = False
+        self.samples = defaultdict(list)
+        self.frame = defaultdict(float)
+
+    def section(self, name):
+        """time a part of the frame, use it as a context manager
+
+        Args:
+            name: name of the part
+
+        Returns:
+            context manager that records the time spent in it
+        """
+        if not self.enabled:
+            return NO_SECTION
+        return Section(self, name)
+
+    def record(self, name, seconds):
+        """add a timing
+
+        Args:
+            name: name of the part
+            seconds: time it took
+        """
+        self.frame[name] += seconds
+        if self.keep_samples:
+            self.samples[name].append(seconds)
+
+    def end_frame(self):
+        """get the time spent in every part during the frame and start the next one
+
+        Returns:
+            dict: seconds per part
+        """
+        frame = dict(self.frame)
+        self.frame.clear()
+        return frame
+
+    def reset(self):
+        """forget all timings"""
+        self.samples.clear()
+        self.frame.clear()
+
+    def summary(self):
+        """get percentiles of all timings
+
+        Returns:
+            dict: per part, the number of samples and p50, p95 and p99 in milliseconds
+        """
+        result = {}
+        for name, samples in self.samples.items():
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99)) * 1000
+            result[name] = {
+                "count": len(samples),
+                "p50": round(float(p50), 4),
+                "p95": round(float(p95), 4),
+                "p99": round(float(p99), 4),
+            }
+        return result
+
+
+profiler = Profiler()
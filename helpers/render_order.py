@@ -0,0 +1,119 @@
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+
+class DepthBucket:
+    """sprites of one z layer, kept ordered by their rect.centery"""
+
+    def __init__(self) -> None:
+        self.keys = []
+        self.sprites = []
+        self.reach = 0  # tallest sprite in the bucket
+
+    def insert(self, key, sprite):
+        """insert a sprite at its place in the y order
+
+        Args:
+            key: (centery, sequence number) of the sprite
+            sprite: sprite to insert
+        """
+        idx = bisect_right(self.keys, key)
+        self.keys.insert(idx, key)
+        self.sprites.insert(idx, sprite)
+        self.reach = max(self.reach, sprite.rect.height)
+
+    def remove(self, key):
+        """remove the sprite stored under a key
+
+        Args:
+            key: (centery, sequence number) of the sprite
+        """
+        idx = bisect_left(self.keys, key)
+        del self.keys[idx]
+        del self.sprites[idx]
+
+    def band(self, top, bottom):
+        """get the sprites that can reach into a horizontal band of the world
+
+        Args:
+            top: top of the band
+            bottom: bottom of the band
+
+        Returns:
+            list: sprites ordered by their centery
+        """
+        start = bisect_left(self.keys, (top - self.reach,))
+        end = bisect_right(self.keys, (bottom + self.reach, float("inf")))
+        return self.sprites[start:end]
+
+
+class RenderOrder:
+    """depth sorted render list, sprites are bucketed by z and ordered by centery inside a bucket,
+    only sprites that moved get re-sorted"""
+
+    def __init__(self) -> None:
+        self.buckets = {}
+        self.layers = []
+        self.keys = {}
+        self.counter = count()  # keeps the insertion order for sprites on the same row
+
+    def place(self, sprite, seq):
+        """put a sprite into the bucket of its current z
+
+        Args:
+            sprite: sprite to place
+            seq: sequence number of the sprite
+        """
+        if sprite.z not in self.buckets:
+            self.buckets[sprite.z] = DepthBucket()
+            self.layers = sorted(self.buckets)
+        key = (sprite.rect.centery, seq)
+        self.buckets[sprite.z].insert(key, sprite)
+        self.keys[sprite] = (sprite.z, key)
+
+    def insert(self, sprite):
+        """add a new sprite to the render list
+
+        Args:
+            sprite: sprite to add
+        """
+        self.place(sprite, next(self.counter))
+
+    def remove(self, sprite):
+        """remove a sprite from the render list
+
+        Args:
+            sprite: sprite to remove
+        """
+        z, key = self.keys.pop(sprite, (None, None))
+        if z is not None:
+            self.buckets[z].remove(key)
+
+    def move(self, sprite):
+        """re-sort a sprite, if its z or centery changed
+
+        Args:
+            sprite: sprite to check
+        """
+        z, key = self.keys[sprite]
+        if z != sprite.z or key[0] != sprite.rect.centery:
+            self.buckets[z].remove(key)
+            self.place(sprite, key[1])
+
+    def layer(self, z, view, visible):
+        """iterate over the visible sprites of one layer in drawing order
+
+        Args:
+            z: layer to iterate over
+            view: rect of the visible part of the world
+            visible: set of sprites that intersect the view
+
+        Yields:
+            sprites, from top to bottom of the screen
+        """
+        bucket = self.buckets.get(z)
+        if bucket is None:
+            return
+        for sprite in bucket.band(view.top, view.bottom):
+            if sprite in visible:
+                yield sprite
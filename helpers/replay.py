@@ -0,0 +1,136 @@
+import numpy as np
+import pygame
+
+from helpers.settings import *
+
+# every key the game reads, a tick of input is one bit per key
+KEYS = (
+    pygame.K_UP,
+    pygame.K_DOWN,
+    pygame.K_LEFT,
+    pygame.K_RIGHT,
+    pygame.K_SPACE,
+    pygame.K_q,
+    pygame.K_LCTRL,
+    pygame.K_e,
+    pygame.K_RETURN,
+    pygame.K_ESCAPE,
+)
+BITS = {key: 1 << bit for bit, key in enumerate(KEYS)}
+REPLAY_VERSION = 1
+
+
+def encode(pressed):
+    """pack the state of the game keys into a bitmask
+
+    Args:
+        pressed: anything indexable by key, like pygame.key.get_pressed()
+
+    Returns:
+        int: bitmask of the pressed keys
+    """
+    mask = 0
+    for key, bit in BITS.items():
+        if pressed[key]:
+            mask |= bit
+    return mask
+
+
+class KeyState:
+    """pressed keys of one tick, indexed like pygame.key.get_pressed()"""
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask) -> None:
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & BITS.get(key, 0))
+
+
+class Keyboard:
+    """input of the game, read once per simulation tick
+
+    Live keys come from source, a replay feeds recorded ticks instead.
+    Both go through the same bitmask, so a replay sees exactly what was recorded.
+    """
+
+    def __init__(self) -> None:
+        self.source = pygame.key.get_pressed
+        self.pressed = KeyState(0)
+        self.recording = None
+        self.replay = None
+        self.tick = 0
+
+    def poll(self):
+        """read the input of the next tick"""
+        if self.replay is not None:
+            mask = int(self.replay[self.tick]) if not self.finished else 0
+        else:
+            mask = encode(self.source())
+            if self.recording is not None:
+                self.recording.append(mask)
+        self.pressed = KeyState(mask)
+        self.tick += 1
+
+    @property
+    def finished(self):
+        """whether a replay has run out of ticks"""
+        return self.replay is not None and self.tick >= len(self.replay)
+
+    def record(self):
+        """start recording the ticks"""
+        self.recording = []
+        self.tick = 0
+
+    def play(self, ticks):
+        """feed recorded ticks instead of the live keys
+
+        Args:
+            ticks: bitmask of every tick
+        """
+        self.replay = ticks
+        self.tick = 0
+
+
+def save_replay(path, seed, ticks):
+    """write a recording to a file
+
+    Args:
+        path: file to write
+        seed: seed of the random module the session started with
+        ticks: bitmask of every tick
+    """
+    with open(path, "wb") as file:
+        np.savez_compressed(
+            file,
+            version=REPLAY_VERSION,
+            seed=seed,
+            rate=SIMULATION_RATE,
+            keys=np.array(KEYS),
+            ticks=np.array(ticks, dtype=np.uint16),
+        )
+
+
+def load_replay(path):
+    """read a recording from a file
+
+    Args:
+        path: file to read
+
+    Returns:
+        tuple: seed and the bitmask of every tick
+    """
+    with np.load(path) as data:
+        if (
+            int(data["version"]) != REPLAY_VERSION
+            or int(data["rate"]) != SIMULATION_RATE
+            or tuple(data["keys"].tolist()) != KEYS
+        ):
+            raise ValueError(
+                f"{path} was recorded by a different version of the game"
+            )
+        return int(data["seed"]), data["ticks"]
+
+
+keyboard = Keyboard()
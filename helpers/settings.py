@@ -7,6 +7,46 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 TILE_SIZE = 64
 
+# game loop
+SIMULATION_RATE = 60  # fixed simulation ticks per second
+FRAME_RATE_CAP = 120  # 0 renders as fast as possible
+VSYNC = False
+MAX_FRAME_TIME = 0.25  # longest frame the simulation catches up on, in seconds
+
+# camera culling
+CAMERA_CELL_SIZE = 256
+CAMERA_MARGIN = TILE_SIZE
+COLLISION_CELL_SIZE = 128
+SWEPT_COLLISION = True  # stops big steps from passing through thin obstacles
+
+# "particles" simulates single drops, "tiled" scrolls pre-rendered textures
+RAIN_MODE = "particles"
+
+# rain particles, spawned in the screen plus a margin around it
+RAIN_SPAWN_RATE = 150  # drops per second, on the floor and in the sky each
+RAIN_POOL_SIZE = 256
+RAIN_MARGIN = 300
+
+# tiled rain textures
+RAIN_TILE_SIZE = 512
+RAIN_TILE_DROPS = 8  # drops on one tile
+RAIN_FLOOR_FRAMES = 3
+RAIN_FLOOR_FRAME_TIME = 0.15  # seconds before the floor splashes change
+
+# white silhouettes of particle effects, kept for this many source images
+FLASH_CACHE_SIZE = 64
+
+# killed particles and fruit kept for reuse, per sprite class
+SPRITE_POOL_LIMIT = 256
+
+# profiler overlay, toggled with F3
+PROFILER_WINDOW = 120  # frames the rolling timings are taken over
+PROFILER_REFRESH = 15  # frames between updates of the text
+PROFILER_LOG = "profile.jsonl"
+
+# static layers are baked into chunks of this size
+CHUNK_SIZE = 512
+
 # overlay positions
 OVERLAY_POSITIONS = {
     "tool": (40, SCREEN_HEIGHT - 15),
@@ -39,6 +79,9 @@ APPLE_POS = {
     "Large": [(30, 24), (60, 65), (50, 50), (16, 40), (45, 50), (42, 70)],
 }
 
+TRANSITION_SPEED = 120  # color steps per second when going to sleep
+RESET_STEPS_PER_TICK = 64  # steps of the new day run per tick while the screen is black
+
 GROW_SPEED = {"corn": 1, "tomato": 0.7}
 
 SALE_PRICES = {"wood": 4, "apple": 2, "corn": 10, "tomato": 20}
@@ -0,0 +1,182 @@
+from collections import defaultdict
+
+import pygame
+
+
+class SpatialGrid:
+    """uniform grid of buckets keyed on rects, for fast area queries"""
+
+    def __init__(self, cell_size) -> None:
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+        self.items = {}
+
+    def cell_range(self, rect):
+        """get the range of cells that a rect covers
+
+        Args:
+            rect: rect to get the cells for
+
+        Returns:
+            tuple: first and last column and row covered by the rect
+        """
+        return (
+            rect.left // self.cell_size,
+            (rect.right - 1) // self.cell_size,
+            rect.top // self.cell_size,
+            (rect.bottom - 1) // self.cell_size,
+        )
+
+    def insert(self, item, rect):
+        """add an item to every cell its rect covers
+
+        Args:
+            item: item to store
+            rect: rect of the item
+        """
+        left, right, top, bottom = span = self.cell_range(rect)
+        for col in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                self.cells[(col, row)].add(item)
+        self.items[item] = span
+
+    def remove(self, item):
+        """remove an item from the grid
+
+        Args:
+            item: item to remove
+        """
+        span = self.items.pop(item, None)
+        if span is None:
+            return
+        left, right, top, bottom = span
+        for col in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                cell = self.cells[(col, row)]
+                cell.discard(item)
+                if not cell:
+                    del self.cells[(col, row)]
+
+    def move(self, item, rect):
+        """re-index an item whose rect has changed, only touching the grid if it changed cells
+
+        Args:
+            item: item to move
+            rect: new rect of the item
+        """
+        if self.items.get(item) != self.cell_range(rect):
+            self.remove(item)
+            self.insert(item, rect)
+
+    def query(self, rect):
+        """get all items whose cells intersect the rect
+
+        Args:
+            rect: area to search
+
+        Returns:
+            set: items in the area, may contain items that are close to but outside the rect
+        """
+        left, right, top, bottom = self.cell_range(rect)
+        found = set()
+        for col in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    found |= cell
+        return found
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+
+class IndexedGroup(pygame.sprite.Group):
+    """Group that keeps its sprites in a spatial grid
+
+    Sprites are indexed lazily, their rect is not set yet when they join.
+    Sprites with a truthy dynamic attribute are re-indexed on every refresh,
+    the rest only when reindex() is called on them.
+    """
+
+    def __init__(self, cell_size):
+        super().__init__()
+        self.index = SpatialGrid(cell_size)
+        self.pending = {}
+        self.dynamic = set()
+
+    def bounds(self, sprite):
+        """get the rect a sprite is indexed by
+
+        Args:
+            sprite: sprite to index
+
+        Returns:
+            pygame.Rect: rect of the sprite, or None if it should not be indexed (yet)
+        """
+        return sprite.rect
+
+    def index_sprite(self, sprite):
+        """put a sprite into the index, or update its place in it
+
+        Args:
+            sprite: sprite to index
+        """
+        bounds = self.bounds(sprite)
+        if bounds is not None:
+            self.index.move(sprite, bounds)
+
+    def unindex_sprite(self, sprite):
+        """remove a sprite from the index
+
+        Args:
+            sprite: sprite to remove
+        """
+        self.index.remove(sprite)
+
+    def add_internal(self, sprite, layer=None):
+        """queue a new sprite for indexing"""
+        super().add_internal(sprite, layer)
+        self.pending[sprite] = None
+
+    def remove_internal(self, sprite):
+        """drop a sprite from the index"""
+        super().remove_internal(sprite)
+        if sprite in self.pending:
+            del self.pending[sprite]
+            return
+        self.dynamic.discard(sprite)
+        self.unindex_sprite(sprite)
+
+    def reindex(self, sprite):
+        """update the place of a sprite whose rect changed
+
+        Args:
+            sprite: sprite that changed
+        """
+        if sprite in self and sprite not in self.pending:
+            self.index_sprite(sprite)
+
+    def refresh_index(self):
+        """index newly added sprites and re-index the dynamic ones"""
+        for sprite in self.pending:
+            self.index_sprite(sprite)
+            if getattr(sprite, "dynamic", False):
+                self.dynamic.add(sprite)
+        self.pending.clear()
+
+        for sprite in self.dynamic:
+            self.index_sprite(sprite)
+
+
+def reindex(sprite):
+    """tell all indexed groups of a sprite that its rect changed
+
+    Args:
+        sprite: sprite that changed
+    """
+    for group in sprite.groups():
+        if isinstance(group, IndexedGroup):
+            group.reindex(sprite)
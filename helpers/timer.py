@@ -1,4 +1,28 @@
-import pygame
+class GameTime:
+    """time of the simulation, it only moves with simulation ticks,
+    so timers behave the same in a replay as in the recorded session"""
+
+    def __init__(self) -> None:
+        self.seconds = 0
+
+    def advance(self, dt):
+        """move the time forward by one tick
+
+        Args:
+            dt: delta time
+        """
+        self.seconds += dt
+
+    def get_ticks(self):
+        """get the time like pygame.time.get_ticks()
+
+        Returns:
+            int: milliseconds of simulation time
+        """
+        return int(self.seconds * 1000)
+
+
+game_time = GameTime()
 
 
 class Timer:  # cooldown function class - finally
@@ -13,7 +37,7 @@ class Timer:  # cooldown function class - finally
     def activate(self):
         """Activate cooldown"""
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = game_time.get_ticks()
 
     def deactivate(self):
         """Deactivate cooldown"""
@@ -22,7 +46,7 @@ class Timer:  # cooldown function class - finally
 
     def update(self):
         """Update cooldown vars"""
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
         if current_time - self.start_time >= self.duration:
             if self.func and self.start_time != 0:
                 self.func()
@@ -1,33 +1,107 @@
+import argparse
+import random
 import sys
+from time import perf_counter
 
 import pygame
 
+from helpers.replay import keyboard, load_replay, save_replay
 from helpers.settings import *
 from map.level import Level
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, record=None):
+        # the whole session follows one seed, so it can be recorded and replayed
+        self.seed = random.randrange(2**32) if seed is None else seed
+        random.seed(self.seed)
+        self.record = record
+        self.replay_start = 0
+        if record:
+            keyboard.record()
+
         pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if VSYNC:
+            self.screen = pygame.display.set_mode(
+                (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED, vsync=1
+            )
+        else:
+            self.screen = pygame.display.set_mode(
+                (SCREEN_WIDTH, SCREEN_HEIGHT)
+            )
         pygame.display.set_caption("Sprout land")
         self.clock = pygame.time.Clock()
         self.level = Level()
 
     def run(self):
+        """run the game loop
+
+        The simulation advances in fixed ticks of 1 / SIMULATION_RATE seconds,
+        as many as fit into the time that passed, and every frame is drawn
+        interpolated between the last two ticks.
+        """
+        tick = 1 / SIMULATION_RATE
+        accumulator = 0
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.level.profiler_overlay.toggle()
+
+            if keyboard.replay is not None:
+                self.replay_frame(tick)
+                continue
+
+            # po zaseknuti (nacitani, presun okna) nedohanime vic nez MAX_FRAME_TIME
+            frame_time = min(
+                self.clock.tick(FRAME_RATE_CAP) / 1000, MAX_FRAME_TIME
+            )
+            accumulator += frame_time
+            while accumulator >= tick:
+                self.level.update(tick)
+                accumulator -= tick
 
-            dt = (
-                self.clock.tick() / 1000
-            )  # deltatime, pro stabilizaci pohyb;, anmiací, atd. na libovolnych FPS
-            self.level.run(dt)
+            self.level.draw(accumulator / tick)
             pygame.display.update()
 
+    def replay_frame(self, tick):
+        """play one recorded tick per frame, as fast as possible, and quit when the recording ends
+
+        Args:
+            tick: length of a simulation tick
+        """
+        if keyboard.tick == 0:
+            self.replay_start = perf_counter()
+        self.level.update(tick)
+        self.level.draw(1)
+        pygame.display.update()
+        if keyboard.finished:
+            elapsed = perf_counter() - self.replay_start
+            print(
+                f"replayed {keyboard.tick} ticks in {elapsed:.2f} s, "
+                f"{keyboard.tick / elapsed:.0f} ticks per second"
+            )
+            self.quit()
+
+    def quit(self):
+        """save the recording, if there is one, and close the game"""
+        if self.record:
+            save_replay(self.record, self.seed, keyboard.recording)
+        pygame.quit()
+        sys.exit()
+
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", help="record the session into a file")
+    parser.add_argument("--replay", help="replay a recorded session")
+    args = parser.parse_args()
+
+    if args.replay:
+        seed, ticks = load_replay(args.replay)
+        keyboard.play(ticks)
+        game = Game(seed)
+    else:
+        game = Game(record=args.record)
     game.run()
@@ -0,0 +1,65 @@
+import numpy as np
+
+# neighbour bits of the autotiling code
+TOP = 1
+RIGHT = 2
+LEFT = 4
+BOTTOM = 8
+
+# name of the soil tile for every neighbour code, indexed by TOP | RIGHT | LEFT | BOTTOM
+SOIL_TILES = (
+    "o",  # no neighbours
+    "b",  # top
+    "l",  # right
+    "bl",  # top, right
+    "r",  # left
+    "br",  # top, left
+    "lr",  # right, left
+    "lrb",  # top, right, left
+    "t",  # bottom
+    "tb",  # top, bottom
+    "tl",  # right, bottom
+    "tbr",  # top, right, bottom
+    "tr",  # left, bottom
+    "tbl",  # top, left, bottom
+    "lrt",  # right, left, bottom
+    "x",  # all sides
+)
+
+
+def neighbour_code(grid, x, y, flag):
+    """pack which of the four neighbours of a cell have a flag into a 4 bit code
+
+    Args:
+        grid: soil grid
+        x: column of the cell
+        y: row of the cell
+        flag: flag the neighbours need to have
+
+    Returns:
+        int: code between 0 and 15
+    """
+    return (
+        TOP * grid.has(x, y - 1, flag)
+        | RIGHT * grid.has(x + 1, y, flag)
+        | LEFT * grid.has(x - 1, y, flag)
+        | BOTTOM * grid.has(x, y + 1, flag)
+    )
+
+
+def neighbour_codes(mask):
+    """compute the neighbour code of every cell of a grid in one pass
+
+    Args:
+        mask: boolean array indexed by [y, x]
+
+    Returns:
+        numpy.ndarray: uint8 array of codes indexed by [y, x]
+    """
+    padded = np.pad(mask, 1).astype(np.uint8)
+    return (
+        TOP * padded[:-2, 1:-1]
+        | RIGHT * padded[1:-1, 2:]
+        | LEFT * padded[1:-1, :-2]
+        | BOTTOM * padded[2:, 1:-1]
+    )
@@ -0,0 +1,50 @@
+import pygame
+
+from helpers.settings import *
+
+
+class Chunk(pygame.sprite.Sprite):
+    """pre-rendered block of static tiles"""
+
+    def __init__(self, pos, surf, groups, z) -> None:
+        super().__init__(groups)
+        self.image = surf
+        self.rect = self.image.get_rect(topleft=pos)
+        self.z = z
+
+
+def bake_chunks(tiles, z, groups):
+    """render static tiles into fixed size chunk surfaces, so the camera blits a handful of chunks instead of every tile
+
+    Args:
+        tiles: list of (position, surface) pairs
+        z: layer the chunks are drawn on
+        groups: sprite groups to add the chunks to
+
+    Returns:
+        list: created chunk sprites
+    """
+    surfaces = {}
+    for pos, surf in tiles:
+        rect = surf.get_rect(topleft=pos)
+        for col in range(rect.left // CHUNK_SIZE, (rect.right - 1) // CHUNK_SIZE + 1):
+            for row in range(
+                rect.top // CHUNK_SIZE, (rect.bottom - 1) // CHUNK_SIZE + 1
+            ):
+                if (col, row) not in surfaces:
+                    surfaces[(col, row)] = pygame.Surface(
+                        (CHUNK_SIZE, CHUNK_SIZE), pygame.SRCALPHA
+                    )
+                surfaces[(col, row)].blit(
+                    surf, (rect.x - col * CHUNK_SIZE, rect.y - row * CHUNK_SIZE)
+                )
+
+    return [
+        Chunk(
+            (col * CHUNK_SIZE, row * CHUNK_SIZE),
+            surf.convert_alpha(),
+            groups,
+            z,
+        )
+        for (col, row), surf in surfaces.items()
+    ]
@@ -0,0 +1,53 @@
+import numpy as np
+import pygame
+
+from helpers.settings import TILE_SIZE
+
+
+class CollisionMap:
+    """static blockers of the map compiled into a boolean tile grid, instead of invisible sprites"""
+
+    def __init__(self, blocked) -> None:
+        self.blocked = blocked
+        self.height, self.width = blocked.shape
+        # same hitbox as a Generic sprite on a blocked tile
+        self.box = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE).inflate(
+            -TILE_SIZE * 0.2, -TILE_SIZE * 0.75
+        )
+
+    def is_blocked(self, x, y):
+        """check if a tile blocks movement
+
+        Args:
+            x: column of the tile
+            y: row of the tile
+
+        Returns:
+            bool: if the tile is blocked, tiles outside of the map are not
+        """
+        return (
+            0 <= x < self.width and 0 <= y < self.height and self.blocked[y, x]
+        )
+
+    def near(self, rect):
+        """get the hitboxes of the blocked tiles that collide with a rect
+
+        Args:
+            rect: area to test, e.g. the hitbox of the player
+
+        Returns:
+            list: colliding hitboxes
+        """
+        left = max(rect.left // TILE_SIZE, 0)
+        right = min((rect.right - 1) // TILE_SIZE, self.width - 1)
+        top = max(rect.top // TILE_SIZE, 0)
+        bottom = min((rect.bottom - 1) // TILE_SIZE, self.height - 1)
+        if left > right or top > bottom:
+            return []
+
+        hitboxes = []
+        for y, x in np.argwhere(self.blocked[top : bottom + 1, left : right + 1]):
+            box = self.box.move((left + x) * TILE_SIZE, (top + y) * TILE_SIZE)
+            if rect.colliderect(box):
+                hitboxes.append(box)
+        return hitboxes
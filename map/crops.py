@@ -0,0 +1,73 @@
+import numpy as np
+
+from helpers.settings import *
+
+CROP_TYPES = tuple(GROW_SPEED)  # crop type ids are indices into this
+NO_CROP = -1
+
+
+class CropStore:
+    """state of every crop on the map, in arrays indexed by [y, x] like the soil grid"""
+
+    def __init__(self, width, height) -> None:
+        self.kind = np.full((height, width), NO_CROP, dtype=np.int8)
+        self.age = np.zeros((height, width))
+        self.speed = np.zeros((height, width))
+        self.max_age = np.zeros((height, width))
+        self.harvestable = np.zeros((height, width), dtype=bool)
+
+    def plant(self, x, y, plant_type, max_age):
+        """put a new crop on a cell
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+            plant_type: name of the crop
+            max_age: age at which the crop can be harvested
+        """
+        self.kind[y, x] = CROP_TYPES.index(plant_type)
+        self.age[y, x] = 0
+        self.speed[y, x] = GROW_SPEED[plant_type]
+        self.max_age[y, x] = max_age
+        self.harvestable[y, x] = False
+
+    def remove(self, x, y):
+        """clear the crop from a cell
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+        """
+        self.kind[y, x] = NO_CROP
+        self.age[y, x] = 0
+        self.harvestable[y, x] = False
+
+    def planted(self):
+        """get the cells with a crop
+
+        Returns:
+            numpy.ndarray: boolean array indexed by [y, x]
+        """
+        return self.kind != NO_CROP
+
+    def grow(self, watered):
+        """grow every watered crop by one day
+
+        Args:
+            watered: boolean array of watered cells, indexed by [y, x]
+
+        Returns:
+            numpy.ndarray: boolean array of the cells whose crop looks different now
+        """
+        growing = self.planted() & watered
+        stage = np.rint(self.age)
+        sprouted = self.age >= 1
+
+        self.age[growing] += self.speed[growing]
+        np.minimum(self.age, self.max_age, out=self.age)
+        self.harvestable |= growing & (self.age >= self.max_age)
+
+        # the image follows the rounded age, the layer and hitbox the whole days
+        return growing & (
+            (np.rint(self.age) != stage) | ((self.age >= 1) != sprouted)
+        )
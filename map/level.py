@@ -1,25 +1,37 @@
-from random import randint
-
 import pygame
-from pytmx.util_pygame import load_pygame
 
+from helpers.animation import Animations
+from helpers.assets import assets
+from helpers.compositor import TintCompositor
+from helpers.jobs import SlicedJob
+from helpers.profiler import profiler
+from helpers.replay import keyboard
+from helpers.render_order import RenderOrder
 from helpers.settings import *
+from helpers.spatial import IndexedGroup
+from helpers.timer import game_time
 from helpers.support import *
-from helpers.support import grid_to_tile, tile_to_grid
-from map.sky import Rain, Sky
+from helpers.support import grid_to_tile
+from map.chunks import bake_chunks
+from map.collision_map import CollisionMap
+from map.rules import roll_rain
+from map.sky import RAIN_ENGINES, Sky
 from map.soil import SoilLayer
+from map.targeting import ToolTargets
+from map.tilemap import CompiledMap
 from map.transition import Transition
 from objects.player import Player
 from objects.sprites import (
     Generic,
     Interaction,
-    Particle,
     Tree,
     Water,
     WildFlower,
+    particle_pool,
 )
 from ui.menu import Menu
 from ui.overlay import Overlay
+from ui.profiler import ProfilerOverlay
 
 
 class Level:
@@ -29,20 +41,30 @@ class Level:
 
         # sprite groups
         self.all_sprites = CameraGroup()
-        self.collision_sprites = pygame.sprite.Group()
+        self.collision_sprites = CollisionGroup()
         self.tree_sprites = pygame.sprite.Group()
         self.interaction_sprites = pygame.sprite.Group()
+        self.animations = Animations()
 
         self.sky = Sky()
-        self.rain = Rain(self.all_sprites)
-        self.raining = randint(0, 10) > 3
-        self.soil_layer = SoilLayer(self.all_sprites, self.collision_sprites)
+        self.compositor = TintCompositor()
+        self.rain = RAIN_ENGINES[RAIN_MODE](self.all_sprites)
+        self.raining = roll_rain()
+        self.tmx_data = CompiledMap("../data/map.tmx")
+        self.targets = ToolTargets()
+        self.soil_layer = SoilLayer(
+            self.all_sprites,
+            self.collision_sprites,
+            self.tmx_data,
+            self.targets,
+        )
         self.soil_layer.raining = self.raining
 
         self.setup()
 
         self.overlay = Overlay(self.player)
-        self.transition = Transition(self.reset, self.player)
+        self.profiler_overlay = ProfilerOverlay(self)
+        self.transition = Transition(self.reset_job, self.player)
         self.shop_active = False
         self.menu = Menu(self.player, self.toggle_shop)
 
@@ -57,7 +79,7 @@ class Level:
             frames: frames for animated objects, defaults to None
         """
 
-        for obj in tmx_data.get_layer_by_name(layer):
+        for obj in tmx_data.objects(layer):
             eval(
                 f"""{type}(
                     pos=(obj.x, obj.y),
@@ -67,7 +89,7 @@ class Level:
                 )"""
             )
 
-    def setup_layer(self, tmx_data, layers, groups, rank="main", frames=None):
+    def setup_layer(self, tmx_data, layers, groups, rank="main", clip=None):
         """setup layers in game world
 
         Args:
@@ -75,14 +97,14 @@ class Level:
             layers: layers to setup
             groups: sprite groups to add objects to
             rank: which layer is the object on, defaults to "main", this is important for drawing order
-            frames: frames for animated objects, defaults to None
+            clip: shared animation of animated objects, defaults to None
         """
         for layer in layers:
-            for x, y, tile in tmx_data.get_layer_by_name(layer).tiles():
+            for x, y, tile in tmx_data.tiles(layer):
                 if layers[0] == "Water":
                     Water(
                         pos=(x * tmx_data.tilewidth, y * tmx_data.tileheight),
-                        frames=frames,
+                        clip=clip,
                         groups=groups,
                     )
                 else:
@@ -93,6 +115,20 @@ class Level:
                         z=LAYERS[rank],
                     )
 
+    def bake_layer(self, tmx_data, layers, rank):
+        """collect the tiles of static layers, so they can be baked into chunks
+
+        Args:
+            tmx_data: tile map data
+            layers: layers to bake
+            rank: which layer the tiles are on, this is important for drawing order
+        """
+        for layer in layers:
+            for x, y, tile in tmx_data.tiles(layer):
+                self.static_tiles.setdefault(LAYERS[rank], []).append(
+                    ((x * tmx_data.tilewidth, y * tmx_data.tileheight), tile)
+                )
+
     def player_add(self, item):
         """add item to player inventory
 
@@ -112,10 +148,9 @@ class Level:
             ["HouseWalls", "HouseFurnitureTop"],
             self.all_sprites,
         )
-        self.setup_layer(
+        self.bake_layer(
             tmx_data,
             ["HouseFloor", "HouseFurnitureBottom"],
-            self.all_sprites,
             rank="house bottom",
         )
         self.setup_layer(
@@ -134,7 +169,9 @@ class Level:
             tmx_data,
             ["Water"],
             self.all_sprites,
-            frames=import_folder("../graphics/water"),
+            clip=self.animations.clip(
+                "water", assets.folder("../graphics/water"), 5
+            ),
         )
 
         self.setup_objects(
@@ -149,6 +186,8 @@ class Level:
             "[self.all_sprites, self.collision_sprites, self.tree_sprites]",
             "Trees",
         )
+        for tree in self.tree_sprites.sprites():
+            self.targets.register("tree", tree, tree.rect)
 
     def setup_layers(self, tmx_data):
         """setup layers in game world
@@ -158,7 +197,7 @@ class Level:
         """
         self.setup_architecture(tmx_data)
 
-        self.setup_layer(tmx_data, ["Collision"], self.collision_sprites)
+        self.collision_map = CollisionMap(tmx_data.mask("Collision"))
 
         self.setup_nature(tmx_data)
 
@@ -169,18 +208,14 @@ class Level:
             plant: the plant to harvest
         """
         self.player_add(plant.plant_type)
-        plant.kill()
-        Particle(
+        self.soil_layer.remove_plant(plant)
+        particle_pool.acquire(
             pos=plant.rect.topleft,
-            surf=pygame.image.load(
-                f"../graphics/fruit/{plant.plant_type}/{plant.max_age}.png"
-            ).convert_alpha(),
+            surf=plant.frames[str(plant.max_age)],
             groups=self.all_sprites,
             z=LAYERS["main"],
             duration=500,
         )
-        col, row = tile_to_grid(plant.rect.center)
-        self.soil_layer.grid[row][col].remove("P")
 
     def plant_collision(self):
         """determine if the player collides with a plant, if harvestable, harvest it"""
@@ -202,9 +237,11 @@ class Level:
                 (obj.x, obj.y),
                 self.all_sprites,
                 self.collision_sprites,
+                self.collision_map,
                 self.tree_sprites,
                 self.interaction_sprites,
                 self.soil_layer,
+                self.targets,
                 self.toggle_shop,
             )
         if obj.name == "Bed":
@@ -224,19 +261,19 @@ class Level:
 
     def setup(self):
         """setup the level"""
-        tmx_data = load_pygame("../data/map.tmx")
-
+        tmx_data = self.tmx_data
+
+        # static layers, only walls, furniture and fences on the main layer stay as tiles,
+        # because they are depth sorted against the player
+        self.static_tiles = {
+            LAYERS["ground"]: [
+                ((0, 0), assets.image("../graphics/world/ground.png"))
+            ]
+        }
         self.setup_layers(tmx_data)
-
-        Generic(
-            pos=(0, 0),
-            surf=pygame.image.load(
-                "../graphics/world/ground.png"
-            ).convert_alpha(),
-            groups=self.all_sprites,
-            z=LAYERS["ground"],
-        )
-        for obj in tmx_data.get_layer_by_name("Player"):
+        for z, tiles in self.static_tiles.items():
+            bake_chunks(tiles, z, self.all_sprites)
+        for obj in tmx_data.objects("Player"):
             self.setup_interactives(obj)
 
     def toggle_shop(self):
@@ -244,82 +281,233 @@ class Level:
         self.shop_active = not self.shop_active
 
     def reset_fruits(self):
-        """reset fruits on trees"""
+        """reset fruits on trees, one tree per step
+
+        Yields:
+            after each tree
+        """
         for tree in self.tree_sprites.sprites():
             for apple in tree.apple_sprites.sprites():
                 apple.kill()
             tree.create_fruit()
+            yield
 
     def reset_map(self):
-        """reset the map, this is called when the player goes to sleep"""
-        self.soil_layer.update_plants()
+        """reset the map, this is called when the player goes to sleep
+
+        Yields:
+            after each small piece of work
+        """
+        yield from self.soil_layer.update_plants_steps()
 
-        self.soil_layer.remove_water()
-        self.raining = randint(0, 10) > 3
+        yield from self.soil_layer.remove_water_steps()
+        self.raining = roll_rain()
         self.soil_layer.raining = self.raining
 
         if self.raining:
-            self.soil_layer.water_all()
+            yield from self.soil_layer.water_all_steps()
 
         self.sky.start_color = [255, 255, 255]
 
-    def reset(self):
-        """reset the level"""
-        self.reset_map()
+    def reset_steps(self):
+        """all the work of starting a new day
 
-        self.reset_fruits()
+        Yields:
+            after each small piece of work
+        """
+        yield from self.reset_map()
 
-    def run(self, dt):
-        """run the level
+        yield from self.reset_fruits()
+
+    def reset_job(self):
+        """start a new day, spread over as many frames as it takes
+
+        Returns:
+            SlicedJob: the reset, run by the sleep transition
+        """
+        return SlicedJob(self.reset_steps())
+
+    def update(self, dt):
+        """advance the simulation by one tick
 
         Args:
-            dt: delta time
+            dt: delta time, the length of a simulation tick
         """
-        self.all_sprites.custom_draw(self.player)
+        game_time.advance(dt)
+        keyboard.poll()
+        self.all_sprites.snapshot()
 
         if self.shop_active:
-            self.menu.update()
+            with profiler.section("menu.update"):
+                self.menu.update()
         else:
-            self.all_sprites.update(dt)
-            self.plant_collision()
+            self.animations.update(dt)
+            with profiler.section("all_sprites.update"):
+                self.all_sprites.update(dt)
+            with profiler.section("plant_collision"):
+                self.plant_collision()
 
-        self.overlay.display()
+        if not self.shop_active:
+            with profiler.section("rain.update"):
+                self.rain.update(dt, self.raining, self.player.rect.center)
 
-        if self.raining and not self.shop_active:
-            self.rain.update(dt)
-
-        self.sky.display(dt)
+        self.sky.update(dt)
 
         if self.player.sleep:
-            self.transition.play(dt)
+            with profiler.section("transition.update"):
+                self.transition.update(dt)
+
+    def draw(self, alpha):
+        """draw the level
+
+        Args:
+            alpha: how far the frame is between the last two simulation ticks, from 0 to 1
+        """
+        with profiler.section("custom_draw"):
+            self.all_sprites.custom_draw(self.player, alpha)
+
+        if self.shop_active:
+            with profiler.section("menu.display"):
+                self.menu.display()
 
+        with profiler.section("overlay.display"):
+            self.overlay.display()
 
-class CameraGroup(pygame.sprite.Group):
+        with profiler.section("sky.display"):
+            self.compositor.push(self.sky.tint())
+            if self.player.sleep:
+                self.compositor.push(self.transition.tint())
+            self.compositor.composite()
+
+        # drawn after the tint, so it can be read at night and during the transition
+        self.profiler_overlay.display()
+
+
+class CameraGroup(IndexedGroup):
     """Group that draws all its sprites with a custom draw function"""
 
     def __init__(self):
-        super().__init__()
+        # spatial index, so only sprites near the screen get drawn,
+        # and a render list that keeps them in drawing order
+        super().__init__(CAMERA_CELL_SIZE)
+        self.order = RenderOrder()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.math.Vector2(0, 0)
+        self.previous = {}
+        self.effects = {}
+
+    def index_sprite(self, sprite):
+        """put a sprite into the index and the render list"""
+        super().index_sprite(sprite)
+        if sprite in self.order.keys:
+            self.order.move(sprite)
+        else:
+            self.order.insert(sprite)
+
+    def unindex_sprite(self, sprite):
+        """drop a sprite from the index and the render list"""
+        super().unindex_sprite(sprite)
+        self.order.remove(sprite)
+
+    def add_effect(self, z, effect):
+        """draw an effect that is not made of sprites on a layer, after the sprites of that layer
+
+        Args:
+            z: layer to draw the effect on
+            effect: object with a draw(surface, offset, alpha) method
+        """
+        self.effects.setdefault(z, []).append(effect)
+
+    def visible_sprites(self):
+        """get the sprites that intersect the screen, plus a small margin, in drawing order
+
+        Returns:
+            iterator: layers and the sprites to draw on them
+        """
+        self.refresh_index()
+        view = pygame.Rect(
+            round(self.offset.x), round(self.offset.y), SCREEN_WIDTH, SCREEN_HEIGHT
+        ).inflate(CAMERA_MARGIN * 2, CAMERA_MARGIN * 2)
+        visible = {
+            sprite
+            for sprite in self.index.query(view)
+            if sprite.rect.colliderect(view)
+        }
+        for z in sorted(set(self.order.layers).union(self.effects)):
+            yield z, self.order.layer(z, view, visible)
+
+    def snapshot(self):
+        """remember where the dynamic sprites are before a simulation tick, so drawing can interpolate"""
+        self.refresh_index()
+        self.previous = {sprite: sprite.rect.center for sprite in self.dynamic}
+
+    def interpolated_center(self, sprite, alpha):
+        """get the center of a sprite between its last two simulation ticks
+
+        Args:
+            sprite: sprite to get the center of
+            alpha: how far between the ticks, from 0 to 1
 
-    def custom_draw(self, player):
-        """draw all sprites in the group, offset by the player position,
+        Returns:
+            pygame.math.Vector2: interpolated center
+        """
+        center = pygame.math.Vector2(sprite.rect.center)
+        previous = self.previous.get(sprite)
+        if previous is None:
+            return center
+        return pygame.math.Vector2(previous).lerp(center, alpha)
+
+    def custom_draw(self, player, alpha=1):
+        """draw all visible sprites in the group, offset by the player position,
            so that the player is always in the center of the screen
 
         Args:
             player: player object
+            alpha: how far the frame is between the last two simulation ticks, from 0 to 1
         """
-        self.offset = pygame.math.Vector2(
-            player.rect.center
+        self.offset = self.interpolated_center(
+            player, alpha
         ) - pygame.math.Vector2(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
 
-        for sprite in sorted(
-            sorted(
-                self.sprites(),
-                key=lambda s: s.rect.centery,  # aby hrac mohl bejt za a pred objekty
+        # sprites are ordered by z, aby se hrac vykresloval na spravne vrstve,
+        # and by centery, aby hrac mohl bejt za a pred objekty
+        for z, sprites in self.visible_sprites():
+            for sprite in sprites:
+                offset_rect = sprite.rect.copy()
+                offset_rect.center = (
+                    self.interpolated_center(sprite, alpha) - self.offset
+                )
+                self.display_surface.blit(sprite.image, offset_rect)
+            for effect in self.effects.get(z, ()):
+                effect.draw(self.display_surface, self.offset, alpha)
+
+
+class CollisionGroup(IndexedGroup):
+    """Group of obstacles, indexed by their hitboxes so only the ones near the player get tested"""
+
+    def __init__(self):
+        super().__init__(COLLISION_CELL_SIZE)
+
+    def bounds(self, sprite):
+        """obstacles are indexed by their hitbox, sprites without one do not collide"""
+        return getattr(sprite, "hitbox", None)
+
+    def near(self, rect):
+        """get the obstacles whose hitbox collides with a rect
+
+        Args:
+            rect: area to test, e.g. the hitbox of the player
+
+        Returns:
+            list: colliding obstacles
+        """
+        self.refresh_index()
+        # the index returns a set, sorting keeps the collisions the same in a replay
+        return sorted(
+            (
+                sprite
+                for sprite in self.index.query(rect)
+                if rect.colliderect(sprite.hitbox)
             ),
-            key=lambda x: x.z,  # aby se hrac vykresloval na spravne vrstve
-        ):
-            offset_rect = sprite.rect.copy()
-            offset_rect.center -= self.offset
-            self.display_surface.blit(sprite.image, offset_rect)
+            key=lambda sprite: (sprite.hitbox.x, sprite.hitbox.y),
+        )
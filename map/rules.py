@@ -0,0 +1,19 @@
+from random import randint
+
+
+def roll_rain():
+    """decide if it rains on a new day
+
+    Returns:
+        bool: if it rains
+    """
+    return randint(0, 10) > 3
+
+
+def roll_fruit():
+    """decide if a fruit grows on one spot of a tree
+
+    Returns:
+        bool: if the fruit grows
+    """
+    return randint(0, 10) < 2
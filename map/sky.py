@@ -1,22 +1,21 @@
-from random import choice, randint
+from random import choice, getrandbits, randint
 
+import numpy as np
 import pygame
 
+from helpers.assets import assets
+from helpers.particles import ParticlePool
 from helpers.settings import *
-from helpers.support import *
-from objects.sprites import Generic
 
 
 class Sky:
     """sky class for day and night cycle"""
 
     def __init__(self) -> None:
-        self.display_surface = pygame.display.get_surface()
-        self.full_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.start_color = [255, 255, 255]
         self.end_color = (38, 101, 189)
 
-    def display(self, dt):
+    def update(self, dt):
         """handle the day and night cycle
 
         Args:
@@ -25,79 +24,248 @@ class Sky:
         for idx, value in enumerate(self.end_color):
             if self.start_color[idx] > value:
                 self.start_color[idx] -= 2 * dt
-        self.full_surface.fill(self.start_color)
-        self.display_surface.blit(
-            self.full_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
+
+    def tint(self):
+        """get the color the screen is multiplied by
+
+        Returns:
+            list: rgb color of the sky
+        """
+        return self.start_color
+
+
+class Rain:
+    """rain class for rain effect
+
+    Drops on the floor and in the sky are particles, spawned only around the camera.
+    """
+
+    def __init__(self, all_sprites) -> None:
+        # seeded from random, so a seeded session rains the same every time
+        self.rng = np.random.default_rng(getrandbits(64))
+        self.floor = ParticlePool(
+            RAIN_POOL_SIZE, assets.folder("../graphics/rain/floor/")
+        )
+        self.drops = ParticlePool(
+            RAIN_POOL_SIZE, assets.folder("../graphics/rain/drops/")
+        )
+        all_sprites.add_effect(LAYERS["rain floor"], self.floor)
+        all_sprites.add_effect(LAYERS["rain drops"], self.drops)
+        self.ground = pygame.Rect(
+            (0, 0), assets.image("../graphics/world/ground.png").get_size()
+        )
+        self.spawn_budget = 0
+
+    def spawn_area(self, center):
+        """get the area around the camera where new drops appear
+
+        The camera offset is interpolated when drawing, so the area is built
+        from the center of the simulation tick instead, for exact replays.
+
+        Args:
+            center: center of the screen in the world, the player position
+
+        Returns:
+            pygame.Rect: the screen plus a margin, clipped to the ground
+        """
+        view = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        view.center = center
+        return view.inflate(RAIN_MARGIN * 2, RAIN_MARGIN * 2).clip(
+            self.ground
+        )
+
+    def random_positions(self, area, count):
+        """pick random top left positions for new drops
+
+        Args:
+            area: rect to spawn in
+            count: number of positions
+
+        Returns:
+            numpy.ndarray: positions, one row per drop
+        """
+        return np.column_stack(
+            (
+                self.rng.integers(area.left, area.right, count, endpoint=True),
+                self.rng.integers(area.top, area.bottom, count, endpoint=True),
+            )
         )
 
+    def create_floor(self, area, count):
+        """generate rain effects on the ground
 
-class Drop(Generic):
-    """drop object for the rain effect
+        Args:
+            area: rect to spawn in
+            count: number of drops
+        """
+        self.floor.spawn(
+            self.random_positions(area, count),
+            np.zeros((count, 2)),
+            self.rng.integers(400, 500, count, endpoint=True) / 1000,
+            self.rng.integers(len(self.floor.surfs), size=count),
+        )
+
+    def create_rain(self, area, count):
+        """generate rain drops in the sky
+
+        Args:
+            area: rect to spawn in
+            count: number of drops
+        """
+        speed = self.rng.integers(200, 250, count, endpoint=True)
+        self.drops.spawn(
+            self.random_positions(area, count),
+            np.outer(speed, (-2, 4)),
+            self.rng.integers(400, 500, count, endpoint=True) / 1000,
+            self.rng.integers(len(self.drops.surfs), size=count),
+        )
+
+    def update(self, dt, raining, center):
+        """update the rain effect
+
+        Args:
+            dt: delta time
+            raining: whether new drops should appear, the old ones always run out their lifetime
+            center: center of the screen in the world, the player position
+        """
+        self.floor.update(dt)
+        self.drops.update(dt)
+        if not raining:
+            self.spawn_budget = 0
+            return
+
+        self.spawn_budget += RAIN_SPAWN_RATE * dt
+        count = int(self.spawn_budget)
+        self.spawn_budget -= count
+        area = self.spawn_area(center)
+        if count and area:
+            self.create_floor(area, count)
+            self.create_rain(area, count)
+
+
+class RainTexture:
+    """seamlessly tiling rain texture, drawn over the screen at a fixed cost
 
     Args:
-        Generic: generic sprite class
+        surfs: drop images to scatter over the texture
+        count: number of drops on one tile
+        ground: rect of the ground, the rain is not drawn outside of it
+        frames: number of differently scattered tiles to flip between
     """
 
-    def __init__(self, surf, pos, moving, groups, z) -> None:
-        super().__init__(pos, surf, groups, z)
-        self.lifetime = randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
+    def __init__(self, surfs, count, ground, frames=1) -> None:
+        self.ground = ground
+        self.frames = [self.render(surfs, count) for _ in range(frames)]
+        self.frame = 0
+        self.scroll = pygame.math.Vector2()
+        self.previous_scroll = pygame.math.Vector2()
+        self.visible = False
 
-        self.moving = moving
-        if self.moving:  # attributes for moving anything in pygame
-            self.pos = pygame.math.Vector2(self.rect.topleft)
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = randint(200, 250)
+    def render(self, surfs, count):
+        """scatter drops over one tile
 
-    def update(self, dt):
-        """make the drop fall down
+        Args:
+            surfs: drop images
+            count: number of drops
+
+        Returns:
+            pygame.Surface: the tile
+        """
+        tile = pygame.Surface(
+            (RAIN_TILE_SIZE, RAIN_TILE_SIZE), pygame.SRCALPHA
+        )
+        for _ in range(count):
+            surf = choice(surfs)
+            x = randint(0, RAIN_TILE_SIZE - 1)
+            y = randint(0, RAIN_TILE_SIZE - 1)
+            # drops crossing the edge continue on the other side of the tile
+            for dx in (0, -RAIN_TILE_SIZE):
+                for dy in (0, -RAIN_TILE_SIZE):
+                    tile.blit(surf, (x + dx, y + dy))
+        return tile.convert_alpha()
+
+    def move(self, step):
+        """scroll the texture
 
         Args:
-            dt: delta time
+            step: distance to scroll by
         """
-        if self.moving:
-            self.pos += self.direction * self.speed * dt
-            self.rect.topleft = round(self.pos.x), round(self.pos.y)
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+        self.previous_scroll.update(self.scroll)
+        self.scroll += step
+        wrap = pygame.math.Vector2(
+            self.scroll.x // RAIN_TILE_SIZE * RAIN_TILE_SIZE,
+            self.scroll.y // RAIN_TILE_SIZE * RAIN_TILE_SIZE,
+        )
+        self.scroll -= wrap
+        self.previous_scroll -= wrap
 
+    def draw(self, surface, offset, alpha=1):
+        """cover the part of the screen over the ground with the texture
 
-class Rain:
-    """rain class for rain effect"""
+        Args:
+            surface: surface to draw on
+            offset: camera offset
+            alpha: how far the frame is between the last two simulation ticks, from 0 to 1
+        """
+        if not self.visible:
+            return
+        scroll = self.previous_scroll.lerp(self.scroll, alpha)
+        left = round(scroll.x - offset.x) % RAIN_TILE_SIZE - RAIN_TILE_SIZE
+        top = round(scroll.y - offset.y) % RAIN_TILE_SIZE - RAIN_TILE_SIZE
+        image = self.frames[self.frame]
 
-    def __init__(self, all_sprites) -> None:
-        self.all_sprites = all_sprites
-        self.rain_drops = import_folder("../graphics/rain/drops/")
-        self.rain_surfs = import_folder("../graphics/rain/floor/")
-        self.floor_w, self.floor_h = pygame.image.load(
-            "../graphics/world/ground.png"
-        ).get_size()
-
-    def create_floor(self):
-        """generate rain effects on the ground"""
-        Drop(
-            choice(self.rain_surfs),
-            (randint(0, self.floor_w), randint(0, self.floor_h)),
-            False,
-            self.all_sprites,
-            LAYERS["rain floor"],
+        clip = surface.get_clip()
+        surface.set_clip(self.ground.move(-round(offset.x), -round(offset.y)))
+        surface.blits(
+            [
+                (image, (x, y))
+                for x in range(left, SCREEN_WIDTH, RAIN_TILE_SIZE)
+                for y in range(top, SCREEN_HEIGHT, RAIN_TILE_SIZE)
+            ],
+            doreturn=False,
         )
+        surface.set_clip(clip)
+
+
+class TiledRain:
+    """cheap rain effect for slow machines
+
+    Instead of single drops, pre-rendered textures are tiled over the screen,
+    the drops in the sky scroll and the splashes on the floor flip between tiles.
+    """
 
-    def create_rain(self):
-        """generate rain drops in the sky"""
-        Drop(
-            choice(self.rain_drops),
-            (randint(0, self.floor_w), randint(0, self.floor_h)),
-            True,
-            self.all_sprites,
-            LAYERS["rain drops"],
+    def __init__(self, all_sprites) -> None:
+        ground = pygame.Rect(
+            (0, 0), assets.image("../graphics/world/ground.png").get_size()
+        )
+        self.floor = RainTexture(
+            assets.folder("../graphics/rain/floor/"),
+            RAIN_TILE_DROPS,
+            ground,
+            RAIN_FLOOR_FRAMES,
         )
+        self.drops = RainTexture(
+            assets.folder("../graphics/rain/drops/"), RAIN_TILE_DROPS, ground
+        )
+        all_sprites.add_effect(LAYERS["rain floor"], self.floor)
+        all_sprites.add_effect(LAYERS["rain drops"], self.drops)
+        self.velocity = pygame.math.Vector2(-2, 4) * 225
+        self.time = 0
 
-    def update(self, dt):
-        """update the rain effect
+    def update(self, dt, raining, center):
+        """scroll the drops and flip the floor splashes
 
         Args:
             dt: delta time
+            raining: whether the rain is shown
+            center: center of the screen in the world, unused because the tiles cover any screen
         """
-        self.create_floor()
-        self.create_rain()
+        self.floor.visible = self.drops.visible = raining
+        self.time += dt
+        self.floor.frame = int(self.time / RAIN_FLOOR_FRAME_TIME) % len(
+            self.floor.frames
+        )
+        self.drops.move(self.velocity * dt)
+
+
+RAIN_ENGINES = {"particles": Rain, "tiled": TiledRain}
@@ -1,10 +1,15 @@
 from random import choice
 
 import pygame
-from pytmx.util_pygame import load_pygame
 
+from helpers.assets import assets
+from helpers.jobs import finish
 from helpers.settings import *
+from helpers.spatial import reindex
 from helpers.support import *
+from map.autotile import SOIL_TILES, neighbour_code, neighbour_codes
+from map.crops import CropStore
+from map.soil_grid import FARMABLE, PLANTED, TILLED, WATERED, SoilGrid
 
 
 class SoilTile(pygame.sprite.Sprite):
@@ -28,98 +33,97 @@ class WaterTile(pygame.sprite.Sprite):
 
 
 class Plant(pygame.sprite.Sprite):
-    """Tile of a harvestable plant"""
+    """Tile of a harvestable plant, its growth is kept in the crop store"""
 
-    def __init__(self, plant_type, groups, soil, check_watered) -> None:
+    def __init__(self, plant_type, groups, soil, crops, cell) -> None:
         super().__init__(groups)
         self.plant_type = plant_type
-        self.frames = import_folder(
+        self.frames = assets.folder(
             f"../graphics/fruit/{plant_type}", return_type="dict"
         )
         self.soil = soil
+        self.crops = crops
+        self.x, self.y = cell
 
-        self.age = 0
         self.max_age = len(self.frames) - 1
-        self.grow_speed = GROW_SPEED[plant_type]
-        self.harvestable = False
+        self.crops.plant(self.x, self.y, plant_type, self.max_age)
 
-        self.image = self.frames[str(self.age)]
+        self.image = self.frames["0"]
         self.y_offset = -16 if plant_type == "corn" else -8
         self.rect = self.image.get_rect(
             midbottom=soil.rect.midbottom
             + pygame.math.Vector2(0, self.y_offset)
         )
         self.z = LAYERS["ground plant"]
-        self.check_watered = check_watered
 
-    def grow(self):
-        """grow the plant with time"""
-        if self.check_watered(self.rect.center):
-            self.age += self.grow_speed
+    @property
+    def age(self):
+        """age of the plant in days"""
+        return float(self.crops.age[self.y, self.x])
 
-            if int(self.age) > 0:
-                self.z = LAYERS["main"]
-                self.hitbox = self.rect.copy().inflate(
-                    -26, -self.rect.height * 0.4
-                )
-
-            if self.age >= self.max_age:
-                self.age = self.max_age
-                self.harvestable = True
+    @property
+    def harvestable(self):
+        """whether the plant is fully grown"""
+        return bool(self.crops.harvestable[self.y, self.x])
 
-            self.image = self.frames[str(round(self.age))]
-            self.rect = self.image.get_rect(
-                midbottom=self.soil.rect.midbottom
-                + pygame.math.Vector2(0, self.y_offset)
+    def show_stage(self):
+        """update the image, layer and hitbox to the age of the plant"""
+        age = self.age
+        self.image = self.frames[str(round(age))]
+        self.rect = self.image.get_rect(
+            midbottom=self.soil.rect.midbottom
+            + pygame.math.Vector2(0, self.y_offset)
+        )
+        if int(age) > 0:
+            self.z = LAYERS["main"]
+            self.hitbox = self.rect.copy().inflate(
+                -26, -self.rect.height * 0.4
             )
+        reindex(self)
 
 
 class SoilLayer:
-    def __init__(self, all_sprites, collision_sprites) -> None:
+    def __init__(
+        self, all_sprites, collision_sprites, tmx_data, targets
+    ) -> None:
         self.all_sprites = all_sprites
+        self.tmx_data = tmx_data
+        self.targets = targets
         self.soil_sprites = pygame.sprite.Group()
         self.water_sprites = pygame.sprite.Group()
         self.plant_sprites = pygame.sprite.Group()
         self.collision_sprites = collision_sprites
 
-        self.soil_surfs = import_folder("../graphics/soil", return_type="dict")
-        self.water_surfs = import_folder("../graphics/soil_water")
-        self.tile_type = "o"
+        self.soil_surfs = assets.folder("../graphics/soil", return_type="dict")
+        self.soil_tile_surfs = [self.soil_surfs[name] for name in SOIL_TILES]
+        self.water_surfs = assets.folder("../graphics/soil_water")
         # print(self.soil_surfs)
         self.create_soil_grid()
-        self.create_hit_rects()
 
         self.raining = False
 
     def create_soil_grid(self):
-        """create the grid for the soil tiles"""
-        ground = pygame.image.load("../graphics/world/ground.png").get_size()
-        h_tiles, v_tiles = tile_to_grid(ground)
-        self.grid = [[[] for col in range(h_tiles)] for row in range(v_tiles)]
-        for x, y, _ in (
-            load_pygame("../data/map.tmx")
-            .get_layer_by_name("Farmable")
-            .tiles()
-        ):
-            self.grid[y][x].append("F")
-
-    def check_watered(self, pos):
-        """check if the farmed tile has been watered
-
-        Args:
-            pos: position of the tile in the grid
-
-        Returns:
-            if the tile has been watered
-        """
-        x, y = tile_to_grid(pos)
-        cell = self.grid[y][x]
-        return "W" in cell
+        """create the grid for the soil tiles and the crops on them"""
+        self.grid = SoilGrid(self.tmx_data.width, self.tmx_data.height)
+        self.grid.set_mask(FARMABLE, self.tmx_data.mask("Farmable"))
+        self.crops = CropStore(self.tmx_data.width, self.tmx_data.height)
 
     def update_plants(self):
         """grow all plants in the grid"""
-        for plant in self.plant_sprites.sprites():
-            plant.grow()
+        finish(self.update_plants_steps())
+
+    def update_plants_steps(self):
+        """grow all plants in the grid at once, then update the sprites that changed, one per step
+
+        Yields:
+            after the growth and after each changed sprite
+        """
+        changed = self.crops.grow(self.grid.mask(WATERED))
+        yield
+        for x, y in self.grid.cells(changed):
+            for plant in self.targets.in_cell("plant", (x, y)):
+                plant.show_stage()
+                yield
 
     def plant_seed(self, point, seed):
         """plant a seed on the farmed tile
@@ -128,36 +132,34 @@ class SoilLayer:
             point: position of the players tool
             seed: seed to plant
         """
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(point):
-                x, y = tile_to_grid(soil_sprite.rect.center)
-                if not "P" in self.grid[y][x]:
-                    self.grid[y][x].append("P")
-                    Plant(
-                        seed,
-                        [
-                            self.all_sprites,
-                            self.plant_sprites,
-                            self.collision_sprites,
-                        ],
-                        soil_sprite,
-                        self.check_watered,
-                    )
-
-    def create_hit_rects(self):
-        """make soil respond to a mouse click with a hoe tool so it can be farmed"""
-        self.hit_rects = []
-        for ridx, row in enumerate(self.grid):
-            for cidx, cell in enumerate(row):
-                if "F" in cell:
-                    self.hit_rects.append(
-                        pygame.Rect(
-                            cidx * TILE_SIZE,
-                            ridx * TILE_SIZE,
-                            TILE_SIZE,
-                            TILE_SIZE,
-                        )
-                    )
+        x, y = self.targets.cell(point)
+        for soil_sprite in self.targets.in_cell("soil", (x, y)):
+            if not self.grid.has(x, y, PLANTED):
+                self.grid.set(x, y, PLANTED)
+                plant = Plant(
+                    seed,
+                    [
+                        self.all_sprites,
+                        self.plant_sprites,
+                        self.collision_sprites,
+                    ],
+                    soil_sprite,
+                    self.crops,
+                    (x, y),
+                )
+                self.targets.register("plant", plant, soil_sprite.rect)
+
+    def remove_plant(self, plant):
+        """remove a plant from the soil
+
+        Args:
+            plant: plant to remove
+        """
+        x, y = plant.x, plant.y
+        self.grid.clear(x, y, PLANTED)
+        self.crops.remove(x, y)
+        self.targets.unregister("plant", plant)
+        plant.kill()
 
     def get_hit(self, point):
         """creates a farmable tile from a piece of soil
@@ -165,152 +167,149 @@ class SoilLayer:
         Args:
             point: position of the players tool
         """
-        for rect in self.hit_rects:
-            if rect.collidepoint(point):
-                x, y = tile_to_grid(rect.center)
-                if "F" in self.grid[y][x]:
-                    print("HIT")
-                    self.grid[y][x].append("X")
-                    self.create_soil_tiles()
-                    if self.raining:
-                        self.water_all()
+        x, y = self.targets.cell(point)
+        if self.grid.has(x, y, FARMABLE):
+            print("HIT")
+            self.till(x, y)
+            if self.raining:
+                self.water_all()
 
-    def water(self, point):
-        """water a farmed tile
+    def till(self, x, y):
+        """turn a cell into farmed soil
 
         Args:
-            point: position of the players tool
+            x: column of the cell
+            y: row of the cell
         """
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(point):
-                x, y = tile_to_grid(soil_sprite.rect.center)
-                if "X" in self.grid[y][x]:
-                    self.grid[y][x].append("W")
-                    WaterTile(
-                        (soil_sprite.rect.x, soil_sprite.rect.y),
-                        choice(self.water_surfs),
-                        [self.water_sprites, self.all_sprites],
-                    )
+        self.grid.set(x, y, TILLED)
+        self.update_soil_tiles(x, y)
 
-    def water_all(self):
-        """water all farmed tiles, used when its raining"""
-        for ridx, row in enumerate(self.grid):
-            for cidx, cell in enumerate(row):
-                if "X" in cell and not "W" in cell:
-                    self.grid[ridx][cidx].append("W")
-                    new_pos = grid_to_tile((cidx, ridx))
-                    WaterTile(
-                        new_pos,
-                        choice(self.water_surfs),
-                        [self.water_sprites, self.all_sprites],
-                    )
+    def untill(self, x, y):
+        """turn a farmed cell back into plain ground, removing its water and plant
 
-    def remove_water(self):
-        """remove all water tiles"""
-        for water_sprite in self.water_sprites.sprites():
-            x, y = tile_to_grid(water_sprite.rect.center)
-            self.grid[y][x].remove("W")
+        Args:
+            x: column of the cell
+            y: row of the cell
+        """
+        for water_sprite in list(self.targets.in_cell("water", (x, y))):
+            self.targets.unregister("water", water_sprite)
             water_sprite.kill()
+        for plant in list(self.targets.in_cell("plant", (x, y))):
+            self.remove_plant(plant)
+        self.grid.clear(x, y, TILLED | WATERED)
+        self.update_soil_tiles(x, y)
 
-    def basic_directions(self, t, r, l, b):
-        """direction for the basic farmed tiles
+    def add_water_tile(self, x, y):
+        """mark a cell as watered and show the water on it
 
         Args:
-            t: top
-            r: right
-            l: left
-            b: bottom
+            x: column of the cell
+            y: row of the cell
         """
-        if all([t, r, l, b]):
-            self.tile_type = "x"
-
-        if l and not any([t, r, b]):
-            self.tile_type = "r"
-
-        if r and not any([t, l, b]):
-            self.tile_type = "l"
-
-        if t and not any([r, l, b]):
-            self.tile_type = "b"
-
-        if b and not any([t, r, l]):
-            self.tile_type = "t"
+        self.grid.set(x, y, WATERED)
+        water_sprite = WaterTile(
+            grid_to_tile((x, y)),
+            choice(self.water_surfs),
+            [self.water_sprites, self.all_sprites],
+        )
+        self.targets.register("water", water_sprite, water_sprite.rect)
 
-    def cross_directions(self, t, r, l, b):
-        """direction for the cross farmed tiles
+    def water(self, point):
+        """water a farmed tile
 
         Args:
-            t: top
-            r: right
-            l: left
-            b: bottom
+            point: position of the players tool
         """
-        if r and l and not any([t, b]):
-            self.tile_type = "lr"
+        x, y = self.targets.cell(point)
+        if self.grid.has(x, y, TILLED) and not self.grid.has(x, y, WATERED):
+            self.add_water_tile(x, y)
+
+    def water_all(self):
+        """water all farmed tiles, used when its raining"""
+        finish(self.water_all_steps())
 
-        if t and b and not any([r, l]):
-            self.tile_type = "tb"
+    def water_all_steps(self):
+        """water all farmed tiles, one tile per step
 
-        if l and b and not any([t, r]):
-            self.tile_type = "tr"
+        Yields:
+            after each tile
+        """
+        dry = self.grid.mask(TILLED) & ~self.grid.mask(WATERED)
+        for x, y in self.grid.cells(dry):
+            self.add_water_tile(x, y)
+            yield
 
-        if r and b and not any([t, l]):
-            self.tile_type = "tl"
+    def remove_water(self):
+        """remove all water tiles"""
+        finish(self.remove_water_steps())
 
-        if t and l and not any([b, r]):
-            self.tile_type = "br"
+    def remove_water_steps(self):
+        """remove all water tiles, one tile per step
 
-        if t and r and not any([b, l]):
-            self.tile_type = "bl"
+        Yields:
+            after each tile
+        """
+        self.grid.clear_mask(WATERED)
+        for water_sprite in self.water_sprites.sprites():
+            self.targets.unregister("water", water_sprite)
+            water_sprite.kill()
+            yield
 
-    def t_shapes(self, t, r, l, b):
-        """direction for the t shaped farmed tiles
+    def update_soil_tile(self, x, y):
+        """create, retile or remove the farmed tile of a single cell
 
         Args:
-            t: top
-            r: right
-            l: left
-            b: bottom
+            x: column of the cell
+            y: row of the cell
         """
-        if all([t, b, r]) and not l:
-            self.tile_type = "tbr"
+        if not self.grid.has(x, y, TILLED):
+            for tile in list(self.targets.in_cell("soil", (x, y))):
+                self.targets.unregister("soil", tile)
+                tile.kill()
+            return
 
-        if all([t, b, l]) and not r:
-            self.tile_type = "tbl"
+        surf = self.soil_tile_surfs[neighbour_code(self.grid, x, y, TILLED)]
+        self.set_soil_tile(x, y, surf)
 
-        if all([t, l, r]) and not b:
-            self.tile_type = "lrb"
+    def set_soil_tile(self, x, y, surf):
+        """show a farmed tile on a cell, reusing its sprite if it has one
 
-        if all([b, l, r]) and not t:
-            self.tile_type = "lrt"
+        Args:
+            x: column of the cell
+            y: row of the cell
+            surf: image of the tile
+        """
+        tiles = self.targets.in_cell("soil", (x, y))
+        if tiles:
+            tiles[0].image = surf
+            return
+
+        tile = SoilTile(
+            grid_to_tile((x, y)),
+            surf,
+            [self.all_sprites, self.soil_sprites],
+        )
+        self.targets.register("soil", tile, tile.rect)
 
-    def autotiling(self, ridx, cidx):
-        """autotiling for the farmed tiles, so they connect to each other
+    def update_soil_tiles(self, x, y):
+        """update the farmed tile of a changed cell and of its neighbours
 
         Args:
-            ridx: row index in grid
-            cidx: column index in grid
+            x: column of the changed cell
+            y: row of the changed cell
         """
-        t, r, l, b = (
-            "X" in self.grid[ridx - 1][cidx],
-            "X" in self.grid[ridx][cidx + 1],
-            "X" in self.grid[ridx][cidx - 1],
-            "X" in self.grid[ridx + 1][cidx],
-        )
-        self.basic_directions(t, r, l, b)
-        self.cross_directions(t, r, l, b)
-        self.t_shapes(t, r, l, b)
-
-    def create_soil_tiles(self):
-        """create the farmed tiles"""
-        self.soil_sprites.empty()
-        for ridx, row in enumerate(self.grid):
-            for cidx, cell in enumerate(row):
-                if "X" in cell:
-                    self.autotiling(ridx, cidx)
-                    new_pos = grid_to_tile((cidx, ridx))
-                    SoilTile(
-                        new_pos,
-                        self.soil_surfs[self.tile_type],
-                        [self.all_sprites, self.soil_sprites],
-                    )
+        for dx, dy in ((0, 0), (0, -1), (1, 0), (-1, 0), (0, 1)):
+            if self.grid.inside(x + dx, y + dy):
+                self.update_soil_tile(x + dx, y + dy)
+
+    def retile_all(self):
+        """update the farmed tiles of the whole grid in one pass, for when many cells changed at once"""
+        tilled = self.grid.mask(TILLED)
+        for tile in self.soil_sprites.sprites():
+            x, y = self.targets.cell(tile.rect.topleft)
+            if not tilled[y, x]:
+                self.targets.unregister("soil", tile)
+                tile.kill()
+        codes = neighbour_codes(tilled)
+        for x, y in self.grid.cells(tilled):
+            self.set_soil_tile(x, y, self.soil_tile_surfs[codes[y, x]])
@@ -0,0 +1,105 @@
+import numpy as np
+
+# soil flags, one bit each
+FARMABLE = 1
+TILLED = 2
+WATERED = 4
+PLANTED = 8
+
+
+class SoilGrid:
+    """state of every soil tile, stored as bit flags in a uint8 array indexed by [y, x]"""
+
+    def __init__(self, width, height) -> None:
+        self.width = width
+        self.height = height
+        self.flags = np.zeros((height, width), dtype=np.uint8)
+
+    def inside(self, x, y):
+        """check if a cell is on the grid
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+
+        Returns:
+            bool: if the cell is on the grid
+        """
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def has(self, x, y, flag):
+        """check if a cell has a flag, cells outside of the grid have no flags
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+            flag: flag to check
+
+        Returns:
+            bool: if the flag is set
+        """
+        return self.inside(x, y) and bool(self.flags[y, x] & flag)
+
+    def set(self, x, y, flag):
+        """set a flag on a cell
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+            flag: flag to set
+        """
+        self.flags[y, x] |= flag
+
+    def clear(self, x, y, flag):
+        """clear a flag on a cell
+
+        Args:
+            x: column of the cell
+            y: row of the cell
+            flag: flag to clear
+        """
+        self.flags[y, x] &= ~np.uint8(flag)
+
+    def mask(self, flag):
+        """get all cells that have a flag
+
+        Args:
+            flag: flag to check
+
+        Returns:
+            numpy.ndarray: boolean array indexed by [y, x]
+        """
+        return (self.flags & flag) != 0
+
+    def set_mask(self, flag, mask):
+        """set a flag on all cells of a mask
+
+        Args:
+            flag: flag to set
+            mask: boolean array indexed by [y, x]
+        """
+        self.flags[mask] |= flag
+
+    def clear_mask(self, flag, mask=None):
+        """clear a flag on all cells of a mask, or on the whole grid
+
+        Args:
+            flag: flag to clear
+            mask: boolean array indexed by [y, x], defaults to the whole grid
+        """
+        if mask is None:
+            self.flags &= ~np.uint8(flag)
+        else:
+            self.flags[mask] &= ~np.uint8(flag)
+
+    def cells(self, mask):
+        """iterate over the cells of a mask, row by row
+
+        Args:
+            mask: boolean array indexed by [y, x]
+
+        Yields:
+            x and y of every cell in the mask
+        """
+        for y, x in np.argwhere(mask):
+            yield int(x), int(y)
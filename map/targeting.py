@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+from helpers.settings import TILE_SIZE
+
+
+class ToolTargets:
+    """entities that tools can hit (soil, water, plants, trees), registered by the grid cells they cover,
+    so the target of a tool is found with a single lookup"""
+
+    def __init__(self) -> None:
+        self.entities = defaultdict(list)
+        self.registered = {}
+
+    def cell(self, pos):
+        """get the grid cell of a position
+
+        Args:
+            pos: position in pixels
+
+        Returns:
+            tuple: column and row of the cell
+        """
+        return int(pos[0] // TILE_SIZE), int(pos[1] // TILE_SIZE)
+
+    def register(self, kind, entity, rect):
+        """register an entity in every cell its rect covers
+
+        Args:
+            kind: kind of the entity, e.g. "soil", "water", "plant" or "tree"
+            entity: entity to register
+            rect: area of the entity
+        """
+        left, top = self.cell(rect.topleft)
+        right, bottom = self.cell((rect.right - 1, rect.bottom - 1))
+        cells = [
+            (col, row)
+            for col in range(left, right + 1)
+            for row in range(top, bottom + 1)
+        ]
+        for cell in cells:
+            self.entities[(kind, cell)].append(entity)
+        self.registered[(kind, entity)] = cells
+
+    def unregister(self, kind, entity):
+        """remove an entity from all its cells
+
+        Args:
+            kind: kind of the entity
+            entity: entity to remove
+        """
+        for cell in self.registered.pop((kind, entity), ()):
+            self.entities[(kind, cell)].remove(entity)
+            if not self.entities[(kind, cell)]:
+                del self.entities[(kind, cell)]
+
+    def in_cell(self, kind, cell):
+        """get the entities of a kind registered in a cell
+
+        Args:
+            kind: kind of the entities
+            cell: column and row of the cell
+
+        Returns:
+            list: entities in the cell, do not modify it
+        """
+        return self.entities.get((kind, cell), [])
+
+    def at(self, kind, pos):
+        """get the entities of a kind registered in the cell under a position
+
+        Args:
+            kind: kind of the entities
+            pos: position in pixels, e.g. the target of a tool
+
+        Returns:
+            list: entities in the cell, do not modify it
+        """
+        return self.in_cell(kind, self.cell(pos))
@@ -0,0 +1,268 @@
+import hashlib
+import os
+import pickle
+from os.path import normpath
+
+import numpy as np
+import pygame
+from pytmx import TiledMap, TiledObjectGroup, TiledTileLayer, TileFlags
+from pytmx.util_pygame import handle_transformation
+
+from helpers.assets import assets
+
+COMPILED_VERSION = 2
+MASK_LAYERS = ("Farmable", "Collision")  # layers that only mark tiles, they are never drawn
+
+
+def record_image(filename, colorkey, **kwargs):
+    """pytmx image loader that only records where the tile images are, without decoding them
+
+    Args:
+        filename: path of the tileset image
+        colorkey: transparent color of the tileset, if any
+
+    Returns:
+        function that describes a tile image
+    """
+
+    def describe(rect=None, flags=None):
+        return (
+            normpath(filename),
+            colorkey,
+            tuple(rect) if rect else None,
+            tuple(flags) if flags else None,
+        )
+
+    return describe
+
+
+def tmx_hash(path):
+    """hash the contents of a tmx file
+
+    Args:
+        path: path to the tmx file
+
+    Returns:
+        str: sha1 of the file
+    """
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def compile_tmx(path):
+    """parse a tmx file into plain arrays and lists
+
+    Args:
+        path: path to the tmx file
+
+    Returns:
+        dict: compiled map data
+    """
+    tmx = TiledMap(path, image_loader=record_image)
+    data = {
+        "size": (tmx.width, tmx.height),
+        "tile_size": (tmx.tilewidth, tmx.tileheight),
+        "layers": {},
+        "masks": {},
+        "objects": {},
+        "images": {},
+    }
+    used_gids = set()
+
+    for layer in tmx.layers:
+        if isinstance(layer, TiledTileLayer):
+            gids = np.array(layer.data, dtype=np.uint32)
+            if layer.name in MASK_LAYERS:
+                data["masks"][layer.name] = np.packbits(gids != 0)
+            else:
+                data["layers"][layer.name] = gids
+                used_gids.update(np.unique(gids).tolist())
+        elif isinstance(layer, TiledObjectGroup):
+            data["objects"][layer.name] = [
+                (obj.name, obj.x, obj.y, obj.width, obj.height, obj.gid)
+                for obj in layer
+            ]
+            used_gids.update(obj.gid for obj in layer)
+
+    for gid in used_gids:
+        if gid and tmx.images[gid]:
+            data["images"][gid] = tmx.images[gid]
+    return data
+
+
+def read_cache(cache_path, header, path):
+    """read the compiled map from the cache, if it was compiled from the same tmx file
+
+    The hash of the tmx file is only computed when its mtime or size changed,
+    it is then stored in the header so the cache can be written back.
+
+    Args:
+        cache_path: path to the compiled map
+        header: version, mtime and size of the tmx file
+        path: path to the tmx file
+
+    Returns:
+        tuple: compiled map data, or None, and whether the cache is up to date
+    """
+    # it is only a cache, anything wrong with it, like a broken file or one
+    # pickled by another numpy version, means compiling the map again
+    try:
+        with open(cache_path, "rb") as file:
+            cached = pickle.load(file)
+            if cached["version"] != COMPILED_VERSION:
+                return None, False
+            if (cached["mtime"], cached["size"]) == (
+                header["mtime"],
+                header["size"],
+            ):
+                return pickle.load(file), True
+            header["hash"] = tmx_hash(path)
+            if cached["hash"] == header["hash"]:
+                return pickle.load(file), False
+    except Exception:
+        pass
+    return None, False
+
+
+def write_cache(cache_path, header, data):
+    """write the compiled map to the cache
+
+    Args:
+        cache_path: path to the compiled map
+        header: version, mtime, size and hash of the tmx file
+        data: compiled map data
+    """
+    try:
+        with open(cache_path, "wb") as file:
+            pickle.dump(header, file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # a read-only data folder only costs us the cache
+
+
+def load_compiled(path, cache_path):
+    """load the compiled map from the cache, compiling it first if the tmx file changed
+
+    Args:
+        path: path to the tmx file
+        cache_path: path to the compiled map
+
+    Returns:
+        dict: compiled map data
+    """
+    stat = os.stat(path)
+    header = {
+        "version": COMPILED_VERSION,
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+    data, fresh = read_cache(cache_path, header, path)
+    if fresh:
+        return data
+    if data is None:
+        data = compile_tmx(path)
+        if "hash" not in header:
+            header["hash"] = tmx_hash(path)
+    # also after a touch or a new checkout, so the tmx is not hashed on every start
+    write_cache(cache_path, header, data)
+    return data
+
+
+class MapObject:
+    """object from an object layer of the map"""
+
+    def __init__(self, name, x, y, width, height, image) -> None:
+        self.name = name
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.image = image
+
+
+class CompiledMap:
+    """tile map loaded from the compiled cache, shared by everything that needs the map"""
+
+    def __init__(self, path, cache_path=None) -> None:
+        data = load_compiled(path, cache_path or path + ".compiled")
+        self.width, self.height = data["size"]
+        self.tilewidth, self.tileheight = data["tile_size"]
+        self.layers = data["layers"]
+        self.masks = data["masks"]
+        self.object_data = data["objects"]
+        self.image_data = data["images"]
+        self.images = {}
+
+    def tile_image(self, gid):
+        """get the surface of a tile, images are only cut out of the tilesets when first used
+
+        Args:
+            gid: global id of the tile
+
+        Returns:
+            pygame.Surface: image of the tile
+        """
+        if gid not in self.images:
+            path, colorkey, rect, flags = self.image_data[gid]
+            image = assets.image(path)
+            if rect:
+                image = image.subsurface(rect)
+            if flags:
+                image = handle_transformation(image, TileFlags(*flags))
+            if colorkey:
+                image = image.convert()
+                image.set_colorkey(pygame.Color(f"#{colorkey}"))
+            self.images[gid] = image
+        return self.images[gid]
+
+    def tiles(self, name):
+        """iterate over the tiles of a tile layer
+
+        Args:
+            name: name of the layer
+
+        Yields:
+            x, y and the surface of each tile
+        """
+        gids = self.layers[name]
+        for y, x in zip(*np.nonzero(gids)):
+            yield int(x), int(y), self.tile_image(int(gids[y, x]))
+
+    def mask(self, name):
+        """get the marked tiles of a mask layer
+
+        Args:
+            name: name of the layer
+
+        Returns:
+            numpy.ndarray: boolean array indexed by [y, x]
+        """
+        count = self.width * self.height
+        return (
+            np.unpackbits(self.masks[name], count=count)
+            .reshape(self.height, self.width)
+            .astype(bool)
+        )
+
+    def objects(self, name, images=True):
+        """get the objects of an object layer
+
+        Args:
+            name: name of the layer
+            images: whether to load the images of the objects, defaults to True
+
+        Returns:
+            list: objects of the layer
+        """
+        return [
+            MapObject(
+                obj_name,
+                x,
+                y,
+                width,
+                height,
+                self.tile_image(gid) if gid and images else None,
+            )
+            for obj_name, x, y, width, height, gid in self.object_data[name]
+        ]
@@ -1,38 +1,43 @@
-import pygame
-
 from helpers.settings import *
 
 
 class Transition:
     """class for the transition when player goes to sleep"""
 
-    def __init__(self, reset, player) -> None:
-        self.display_surface = pygame.display.get_surface()
-        self.reset = reset
+    def __init__(self, reset_job, player) -> None:
+        self.reset_job = reset_job
         self.player = player
 
-        self.image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         self.color = 255
-        self.speed = -2
+        self.speed = -TRANSITION_SPEED
+        self.job = None
 
-    def play(self, dt):
-        """play the transition
+    def update(self, dt):
+        """advance the transition, the screen stays black until the reset job is done
 
         Args:
             dt: delta time
         """
-        self.color += self.speed
+        if self.job is not None:
+            if not self.job.run(RESET_STEPS_PER_TICK):
+                return
+            self.job = None
+
+        self.color += self.speed * dt
 
         if self.color <= 0:
             self.color = 0
-            self.speed = 2
-            self.reset()
+            self.speed = TRANSITION_SPEED
+            self.job = self.reset_job()
         elif self.color >= 255:
             self.color = 255
             self.player.sleep = False
-            self.speed = -2
+            self.speed = -TRANSITION_SPEED
 
-        self.image.fill((self.color, self.color, self.color))
-        self.display_surface.blit(
-            self.image, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
-        )
+    def tint(self):
+        """get the color the screen is darkened by
+
+        Returns:
+            tuple: gray of the current transition color
+        """
+        return (self.color, self.color, self.color)
@@ -2,20 +2,28 @@ import os
 
 import pygame
 
+from helpers.animation import AnimationClock
+from helpers.assets import assets
+from helpers.collision import time_of_impact
+from helpers.replay import keyboard
 from helpers.settings import *
 from helpers.support import *
 from helpers.timer import Timer
 
 
 class Player(pygame.sprite.Sprite):
+    dynamic = True  # moves around, the camera has to keep re-indexing it
+
     def __init__(
         self,
         pos,
         group,
         collision_sprites,
+        collision_map,
         tree_sprites,
         interaction_sprites,
         soil_layer,
+        targets,
         toggle_shop,
     ):
         super().__init__(group)
@@ -23,10 +31,10 @@ class Player(pygame.sprite.Sprite):
         # animation attrs
         self.import_assets()
         self.status = "down_idle"
-        self.frame_index = 0
+        self.clock = AnimationClock(4)
 
         # general setup
-        self.image = self.animations[self.status][self.frame_index]
+        self.image = self.clock.frame(self.animations[self.status])
         self.rect = self.image.get_rect(center=pos)
         self.hitbox = self.rect.copy().inflate(-126, -70)
         self.z = LAYERS["main"]
@@ -39,8 +47,10 @@ class Player(pygame.sprite.Sprite):
 
         # additional sprites to be aware of
         self.collision_sprites = collision_sprites
+        self.collision_map = collision_map
         self.tree_sprites = tree_sprites
         self.soil_layer = soil_layer
+        self.targets = targets
         self.interaction = interaction_sprites
 
         # timers (cooldowns)
@@ -85,7 +95,7 @@ class Player(pygame.sprite.Sprite):
         elif self.selected_tool == "water":
             self.soil_layer.water(self.target_pos)
         elif self.selected_tool == "axe":
-            for tree in self.tree_sprites.sprites():
+            for tree in self.targets.at("tree", self.target_pos):
                 if tree.rect.collidepoint(self.target_pos):
                     tree.damage()
 
@@ -107,7 +117,7 @@ class Player(pygame.sprite.Sprite):
 
         for animation in os.listdir("../graphics/character"):
             full_path = "../graphics/character/" + animation
-            self.animations[animation] = import_folder(full_path)
+            self.animations[animation] = assets.folder(full_path)
 
     def animate(self, dt):
         """animate the player
@@ -115,11 +125,9 @@ class Player(pygame.sprite.Sprite):
         Args:
             dt: delta time
         """
-        self.frame_index += 4 * dt
-        if self.frame_index >= len(self.animations[self.status]):
-            self.frame_index = 0
-
-        self.image = self.animations[self.status][int(self.frame_index)]
+        frames = self.animations[self.status]
+        self.clock.advance(dt, len(frames))
+        self.image = self.clock.frame(frames)
 
     def movement(self, keys):
         """move the player in the direction of the pressed key
@@ -155,7 +163,7 @@ class Player(pygame.sprite.Sprite):
         if keys[pygame.K_SPACE]:
             self.timers["tool use"].activate()
             self.direction = pygame.math.Vector2()
-            self.frame_index = 0
+            self.clock.reset()
 
         if keys[pygame.K_q] and not self.timers["tool switch"].active:
             self.timers["tool switch"].activate()
@@ -168,7 +176,7 @@ class Player(pygame.sprite.Sprite):
         if keys[pygame.K_LCTRL]:
             self.timers["seed use"].activate()
             self.direction = pygame.math.Vector2()
-            self.frame_index = 0
+            self.clock.reset()
 
         if keys[pygame.K_e] and not self.timers["seed switch"].active:
             self.timers["seed switch"].activate()
@@ -192,7 +200,7 @@ class Player(pygame.sprite.Sprite):
 
     def input(self):
         """parse the input of the player"""
-        keys = pygame.key.get_pressed()
+        keys = keyboard.pressed
 
         if (
             not self.timers["tool use"].active and not self.sleep
@@ -215,49 +223,87 @@ class Player(pygame.sprite.Sprite):
         for timer in self.timers.values():
             timer.update()
 
-    def x_collision(self, sprite):
-        """determine collision in the x direction, and eliminate any weird teleporting around the sprite
+    def x_collision(self, hitbox):
+        """determine collision in the x direction, and eliminate any weird teleporting around the obstacle
 
         Args:
-            sprite: sprite to check collision with
+            hitbox: hitbox of the obstacle to check collision with
         """
         if self.direction.x > 0:
-            self.hitbox.right = sprite.hitbox.left
+            self.hitbox.right = hitbox.left
             self.rect.right = self.hitbox.right
         elif self.direction.x < 0:
-            self.hitbox.left = sprite.hitbox.right
+            self.hitbox.left = hitbox.right
             self.rect.left = self.hitbox.left
         self.rect.centerx = self.hitbox.centerx
         self.pos.x = self.hitbox.centerx
 
-    def y_collision(self, sprite):
-        """determine collision in the y direction, and eliminate any weird teleporting around the sprite
+    def y_collision(self, hitbox):
+        """determine collision in the y direction, and eliminate any weird teleporting around the obstacle
 
         Args:
-            sprite: sprite to check collision with
+            hitbox: hitbox of the obstacle to check collision with
         """
         if self.direction.y > 0:
-            self.hitbox.bottom = sprite.hitbox.top
+            self.hitbox.bottom = hitbox.top
             self.rect.bottom = self.hitbox.bottom
         elif self.direction.y < 0:
-            self.hitbox.top = sprite.hitbox.bottom
+            self.hitbox.top = hitbox.bottom
             self.rect.top = self.hitbox.top
         self.rect.centery = self.hitbox.centery
         self.pos.y = self.hitbox.centery
 
+    def obstacles(self, rect):
+        """get the hitboxes of all obstacles near a rect
+
+        Args:
+            rect: area to search
+
+        Returns:
+            list: hitboxes of static tiles and of obstacle sprites
+        """
+        return self.collision_map.near(rect) + [
+            sprite.hitbox for sprite in self.collision_sprites.near(rect)
+        ]
+
     def collision(self, direction):
-        """detect collision with other sprites
+        """detect collision with the static map and with other sprites
 
         Args:
             direction: direction of the possible collision
         """
-        for sprite in self.collision_sprites.sprites():
-            if hasattr(sprite, "hitbox"):
-                if self.hitbox.colliderect(sprite.hitbox):
-                    if direction == "horizontal":
-                        self.x_collision(sprite)
-                    if direction == "vertical":
-                        self.y_collision(sprite)
+        for hitbox in self.obstacles(self.hitbox):
+            if self.hitbox.colliderect(hitbox):
+                if direction == "horizontal":
+                    self.x_collision(hitbox)
+                if direction == "vertical":
+                    self.y_collision(hitbox)
+
+    def sweep(self, start):
+        """swept collision, stop the hitbox at the first obstacle between its start and its new position,
+        so a big step can not jump over thin obstacles
+
+        Args:
+            start: hitbox before the movement
+        """
+        dx, dy = self.hitbox.x - start.x, self.hitbox.y - start.y
+        if not dx and not dy:
+            return
+
+        times = [
+            time_of_impact(start, dx, dy, hitbox)
+            for hitbox in self.obstacles(start.union(self.hitbox))
+        ]
+        impact = min((time for time in times if time is not None), default=None)
+        if impact is not None:
+            self.hitbox.topleft = (
+                start.x + round(dx * impact),
+                start.y + round(dy * impact),
+            )
+            if dx:
+                self.pos.x = self.hitbox.centerx
+            if dy:
+                self.pos.y = self.hitbox.centery
 
     def move_x(self, dt):
         """move the player in the x direction
@@ -265,8 +311,11 @@ class Player(pygame.sprite.Sprite):
         Args:
             dt: delta time
         """
+        start = self.hitbox.copy()
         self.pos.x += self.direction.x * self.speed * dt
         self.hitbox.centerx = round(self.pos.x)
+        if SWEPT_COLLISION:
+            self.sweep(start)
         self.rect.centerx = self.hitbox.centerx
         self.collision("horizontal")
 
@@ -276,8 +325,11 @@ class Player(pygame.sprite.Sprite):
         Args:
             dt: delta time
         """
+        start = self.hitbox.copy()
         self.pos.y += self.direction.y * self.speed * dt
         self.hitbox.centery = round(self.pos.y)
+        if SWEPT_COLLISION:
+            self.sweep(start)
         self.rect.centery = self.hitbox.centery
         self.collision("vertical")
 
@@ -1,11 +1,32 @@
-from random import choice, randint
+from functools import lru_cache
+from random import choice
 from typing import Any
 
 import pygame
 
+from helpers.assets import assets
+from helpers.pool import Poolable, SpritePool
 from helpers.settings import *
 from helpers.settings import LAYERS
-from helpers.timer import Timer
+from helpers.spatial import reindex
+from helpers.timer import Timer, game_time
+from map.rules import roll_fruit
+
+
+@lru_cache(maxsize=FLASH_CACHE_SIZE)
+def flash_surface(surf):
+    """get the white silhouette of a surface, cached per source surface
+
+    Args:
+        surf: surface to make white
+
+    Returns:
+        pygame.Surface: white surface with black as the transparent color
+    """
+    mask_surf = pygame.mask.from_surface(surf)
+    new_surf = mask_surf.to_surface()
+    new_surf.set_colorkey((0, 0, 0))
+    return new_surf
 
 
 class Generic(pygame.sprite.Sprite):
@@ -32,36 +53,24 @@ class Water(Generic):
         Generic: generic sprite class
     """
 
-    def __init__(self, pos, frames, groups) -> None:
-        self.frames = frames
-        self.frame_index = 0
+    def __init__(self, pos, clip, groups) -> None:
+        self.clip = clip
 
         super().__init__(
             pos=pos,
-            surf=self.frames[self.frame_index],
+            surf=self.clip.image,
             groups=groups,
             z=LAYERS["water"],
         )
 
-    def animate(self, dt):
-        """animate the water
+    @property
+    def image(self):
+        """current frame of the water clip, shared by all water tiles"""
+        return self.clip.image
 
-        Args:
-            dt: delta time
-        """
-        self.frame_index += 5 * dt
-        if self.frame_index >= len(self.frames):
-            self.frame_index = 0
-
-        self.image = self.frames[int(self.frame_index)]
-
-    def update(self, dt):
-        """update the water with time
-
-        Args:
-            dt: delta time
-        """
-        self.animate(dt)
+    @image.setter
+    def image(self, surf):
+        pass  # the frame always comes from the clip
 
 
 class WildFlower(Generic):
@@ -76,8 +85,8 @@ class WildFlower(Generic):
         self.hitbox = self.rect.copy().inflate(-20, -self.rect.height * 0.9)
 
 
-class Particle(Generic):
-    """particle effects for objects
+class Particle(Poolable, Generic):
+    """particle effects for objects, created through particle_pool
 
     Args:
         Generic: generic sprite class
@@ -85,16 +94,13 @@ class Particle(Generic):
 
     def __init__(self, pos, surf, groups, z, duration=100) -> None:
         super().__init__(pos, surf, groups, z)
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = game_time.get_ticks()
         self.duration = duration
         self.flash()
 
     def flash(self):
         """make the sprite white"""
-        mask_surf = pygame.mask.from_surface(self.image)
-        new_surf = mask_surf.to_surface()
-        new_surf.set_colorkey((0, 0, 0))
-        self.image = new_surf
+        self.image = flash_surface(self.image)
 
     def update(self, dt):
         """play the animation, where the white sprite fades away
@@ -102,7 +108,7 @@ class Particle(Generic):
         Args:
             dt: delta time
         """
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
         if current_time - self.start_time >= self.duration:
             self.kill()
 
@@ -116,12 +122,13 @@ class Tree(Generic):
 
     def __init__(self, pos, surf, groups, name, player_add) -> None:
         super().__init__(pos, surf, groups)
+        self.all_sprites = groups[0]  # sprite.groups() is an unordered set
 
         self.health = 5
         self.alive = True
-        self.stump = pygame.image.load(
+        self.stump = assets.image(
             f'../graphics/stumps/{"small" if name=="Small" else "large"}.png'
-        ).convert_alpha()
+        )
 
         self.invul_timer = Timer(200)
         self.player_add = player_add
@@ -134,9 +141,7 @@ class Tree(Generic):
         Args:
             name: name of the tree (small or large)
         """
-        self.apple = pygame.image.load(
-            "../graphics/fruit/apple.png"
-        ).convert_alpha()
+        self.apple = assets.image("../graphics/fruit/apple.png")
         self.apple_pos = APPLE_POS[name]
         self.apple_sprites = pygame.sprite.Group()
         self.create_fruit()
@@ -147,10 +152,10 @@ class Tree(Generic):
 
         if len(self.apple_sprites.sprites()) > 0:
             random_apple = choice(self.apple_sprites.sprites())
-            Particle(
+            particle_pool.acquire(
                 random_apple.rect.topleft,
                 random_apple.image,
-                self.groups()[0],
+                self.all_sprites,
                 LAYERS["fruit"],
             )
             self.player_add("apple")
@@ -159,10 +164,10 @@ class Tree(Generic):
     def check_death(self):
         """check if the tree has been cut down"""
         if self.health <= 0:
-            Particle(
+            particle_pool.acquire(
                 self.rect.topleft,
                 self.image,
-                self.groups()[0],
+                self.all_sprites,
                 LAYERS["main"],
             )
             self.player_add("wood")
@@ -172,6 +177,7 @@ class Tree(Generic):
                 -10, -self.rect.height * 0.6
             )
             self.alive = False
+            reindex(self)
 
     def update(self, dt):
         """update the tree with time
@@ -185,19 +191,27 @@ class Tree(Generic):
     def create_fruit(self):
         """create fruit on the tree"""
         for pos in self.apple_pos:
-            if randint(0, 10) < 2:
+            if roll_fruit():
                 apple_pos = (
                     self.rect.left + pos[0],
                     self.rect.top + pos[1],
                 )
-                Generic(
+                fruit_pool.acquire(
                     apple_pos,
                     self.apple,
-                    [self.apple_sprites, self.groups()[0]],
+                    [self.apple_sprites, self.all_sprites],
                     z=LAYERS["fruit"],
                 )
 
 
+class Fruit(Poolable, Generic):
+    """fruit hanging on a tree, created through fruit_pool
+
+    Args:
+        Generic: generic sprite class
+    """
+
+
 class Interaction(Generic):
     """interaction class for the interaction object"""
 
@@ -205,3 +219,8 @@ class Interaction(Generic):
         surf = pygame.Surface(size)
         super().__init__(pos, surf, groups)
         self.name = name
+
+
+# effects and fruit come and go all the time, their sprites are reused
+particle_pool = SpritePool(Particle)
+fruit_pool = SpritePool(Fruit)
@@ -0,0 +1,210 @@
+"""Fast-forward the farm for a number of days, without a window or any sprites.
+
+Runs the same rules as the game: tilling the farmable soil, watering, the
+rain roll, crop growth and the fruit on the trees, then prints the yields
+and how long the simulation took. Run it from this folder, like main.py.
+
+The apples are only counted as grown: the game pays for the ones knocked
+off the trees with the axe, so they are an upper bound and not income.
+"""
+
+import argparse
+import os
+import random
+from time import perf_counter
+
+import numpy as np
+
+from helpers.settings import *
+from map.crops import CROP_TYPES, CropStore
+from map.rules import roll_fruit, roll_rain
+from map.soil_grid import FARMABLE, TILLED, WATERED, SoilGrid
+from map.tilemap import CompiledMap
+
+
+def crop_max_age(plant_type):
+    """get the age at which a crop can be harvested, one day per growth image
+
+    Args:
+        plant_type: name of the crop
+
+    Returns:
+        int: max age of the crop
+    """
+    return len(os.listdir(f"../graphics/fruit/{plant_type}")) - 1
+
+
+def positive(value):
+    """argparse type of a whole number of at least 1
+
+    Args:
+        value: text of the argument
+
+    Returns:
+        int: the number
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not at least 1")
+    return number
+
+
+class FarmSimulation:
+    """the daily farm loop of the game, on arrays only
+
+    Args:
+        tmx_data: compiled map
+        crop: crop to plant, or "mixed" to alternate them by column
+        water: whether the farmer waters every day, otherwise only rain does
+        scale: the farmable area is repeated scale times in both directions
+    """
+
+    def __init__(self, tmx_data, crop="mixed", water=True, scale=1) -> None:
+        farmable = np.tile(tmx_data.mask("Farmable"), (scale, scale))
+        height, width = farmable.shape
+        self.grid = SoilGrid(width, height)
+        self.grid.set_mask(FARMABLE, farmable)
+        self.crops = CropStore(width, height)
+        self.crop = crop
+        self.water = water
+        self.max_age = {name: crop_max_age(name) for name in CROP_TYPES}
+
+        # every spot on every tree where an apple can grow
+        self.fruit_spots = scale * scale * sum(
+            len(APPLE_POS[obj.name])
+            for obj in tmx_data.objects("Trees", images=False)
+        )
+
+        self.raining = roll_rain()
+        self.yields = dict.fromkeys(CROP_TYPES, 0)
+        self.apples = 0
+        self.seeds = dict.fromkeys(CROP_TYPES, 0)
+        self.rainy_days = 0
+        self.timings = {"day": [], "growth": []}
+
+    def seed_mask(self, plant_type):
+        """get the empty tilled cells a crop is planted on
+
+        Args:
+            plant_type: name of the crop
+
+        Returns:
+            numpy.ndarray: boolean array indexed by [y, x]
+        """
+        empty = self.grid.mask(TILLED) & ~self.crops.planted()
+        if self.crop == "mixed":
+            columns = np.arange(self.grid.width) % len(CROP_TYPES)
+            return empty & (columns == CROP_TYPES.index(plant_type))
+        if self.crop == plant_type:
+            return empty
+        return np.zeros_like(empty)
+
+    def work(self):
+        """the farmers day: harvest, till, plant and water"""
+        self.rainy_days += self.raining
+        ripe = self.crops.planted() & self.crops.harvestable
+        counts = np.bincount(
+            self.crops.kind[ripe], minlength=len(CROP_TYPES)
+        )
+        for plant_type, count in zip(CROP_TYPES, counts.tolist()):
+            self.yields[plant_type] += count
+        ys, xs = np.nonzero(ripe)
+        self.crops.remove(xs, ys)
+
+        self.grid.set_mask(TILLED, self.grid.mask(FARMABLE))
+        if self.raining:
+            self.grid.set_mask(WATERED, self.grid.mask(TILLED))
+
+        for plant_type in CROP_TYPES:
+            ys, xs = np.nonzero(self.seed_mask(plant_type))
+            self.crops.plant(xs, ys, plant_type, self.max_age[plant_type])
+            self.seeds[plant_type] += len(xs)
+
+        if self.water:
+            self.grid.set_mask(WATERED, self.grid.mask(TILLED))
+
+    def night(self):
+        """the new day, in the same order as Level.reset_steps"""
+        start = perf_counter()
+        self.crops.grow(self.grid.mask(WATERED))
+        self.timings["growth"].append(perf_counter() - start)
+
+        self.grid.clear_mask(WATERED)
+        self.raining = roll_rain()
+        if self.raining:
+            self.grid.set_mask(WATERED, self.grid.mask(TILLED))
+
+        self.apples += sum(
+            roll_fruit() for _ in range(self.fruit_spots)
+        )
+
+    def run(self, days):
+        """simulate a number of days
+
+        Args:
+            days: number of days
+        """
+        for _ in range(days):
+            start = perf_counter()
+            self.work()
+            self.night()
+            self.timings["day"].append(perf_counter() - start)
+
+    def report(self):
+        """print the yields, the money they make and the timings"""
+        cells = int(np.count_nonzero(self.grid.mask(FARMABLE)))
+        days = len(self.timings["day"])
+        print(f"days {days}, rainy {self.rainy_days}, farmable cells {cells}")
+        for item, amount in self.yields.items():
+            print(f"  {item:8} {amount:8} x {SALE_PRICES[item]}")
+        income = sum(
+            amount * SALE_PRICES[item] for item, amount in self.yields.items()
+        )
+        spent = sum(
+            amount * PURCHASE_PRICES[item]
+            for item, amount in self.seeds.items()
+        )
+        print(f"income {income}, seeds {spent}, profit {income - spent}")
+        print(
+            f"apples grown {self.apples}, worth at most "
+            f"{self.apples * SALE_PRICES['apple']}, only the ones knocked "
+            "off with the axe are sold"
+        )
+
+        total = sum(self.timings["day"])
+        print(
+            f"time {total * 1000:.1f} ms, "
+            f"{total / days * 1000:.3f} ms per day, "
+            f"growth {sum(self.timings['growth']) / days * 1000:.3f} ms per day"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=positive, default=30)
+    parser.add_argument(
+        "--crop", choices=["mixed", *CROP_TYPES], default="mixed"
+    )
+    parser.add_argument(
+        "--no-water",
+        dest="water",
+        action="store_false",
+        help="only the rain waters the crops",
+    )
+    parser.add_argument(
+        "--scale",
+        type=positive,
+        default=1,
+        help="repeat the farmable area to test bigger farms",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="seed of the rain and fruit rolls"
+    )
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    simulation = FarmSimulation(
+        CompiledMap("../data/map.tmx"), args.crop, args.water, args.scale
+    )
+    simulation.run(args.days)
+    simulation.report()
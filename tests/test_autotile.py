@@ -0,0 +1,78 @@
+import os
+import sys
+from itertools import product
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map.autotile import (
+    BOTTOM,
+    LEFT,
+    RIGHT,
+    SOIL_TILES,
+    TOP,
+    neighbour_code,
+    neighbour_codes,
+)
+from map.soil_grid import TILLED, SoilGrid
+
+
+def chained_tile(t, r, l, b):
+    """the chained checks of the old SoilLayer.autotiling, a cell without neighbours is "o" """
+    tile_type = "o"
+    # basic directions
+    if all([t, r, l, b]):
+        tile_type = "x"
+    if l and not any([t, r, b]):
+        tile_type = "r"
+    if r and not any([t, l, b]):
+        tile_type = "l"
+    if t and not any([r, l, b]):
+        tile_type = "b"
+    if b and not any([t, r, l]):
+        tile_type = "t"
+    # cross directions
+    if r and l and not any([t, b]):
+        tile_type = "lr"
+    if t and b and not any([r, l]):
+        tile_type = "tb"
+    if l and b and not any([t, r]):
+        tile_type = "tr"
+    if r and b and not any([t, l]):
+        tile_type = "tl"
+    if t and l and not any([b, r]):
+        tile_type = "br"
+    if t and r and not any([b, l]):
+        tile_type = "bl"
+    # t shapes
+    if all([t, b, r]) and not l:
+        tile_type = "tbr"
+    if all([t, b, l]) and not r:
+        tile_type = "tbl"
+    if all([t, l, r]) and not b:
+        tile_type = "lrb"
+    if all([b, l, r]) and not t:
+        tile_type = "lrt"
+    return tile_type
+
+
+def test_soil_tiles_match_the_chained_rules():
+    assert len(SOIL_TILES) == 16
+    for t, r, l, b in product((False, True), repeat=4):
+        code = TOP * t | RIGHT * r | LEFT * l | BOTTOM * b
+        assert SOIL_TILES[code] == chained_tile(t, r, l, b)
+
+
+def test_neighbour_codes_match_neighbour_code():
+    rng = np.random.default_rng(0)
+    for density in (0.2, 0.5, 0.8):
+        tilled = rng.random((9, 13)) < density
+        grid = SoilGrid(13, 9)
+        grid.set_mask(TILLED, tilled)
+
+        codes = neighbour_codes(grid.mask(TILLED))
+
+        assert codes.shape == tilled.shape
+        for y, x in np.ndindex(tilled.shape):
+            assert codes[y, x] == neighbour_code(grid, x, y, TILLED)
@@ -0,0 +1,68 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+CODE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, CODE)
+
+pygame = pytest.importorskip("pygame")
+
+from helpers.assets import assets
+from helpers.settings import TILE_SIZE
+from map.autotile import SOIL_TILES
+from map.soil import SoilLayer
+from map.soil_grid import PLANTED, TILLED, WATERED
+from map.targeting import ToolTargets
+
+GROWTH_STAGES = 4
+
+
+def fake_folder(path, return_type="list"):
+    """small surfaces instead of the graphics of the game, which are not part of the code"""
+    surf = pygame.Surface((TILE_SIZE, TILE_SIZE))
+    if return_type == "list":
+        return [surf]
+    if "fruit" in path:
+        return {str(stage): surf for stage in range(GROWTH_STAGES)}
+    return dict.fromkeys(SOIL_TILES, surf)
+
+
+@pytest.fixture
+def soil_layer(monkeypatch):
+    monkeypatch.setattr(assets, "folder", fake_folder)
+    monkeypatch.setattr(
+        assets, "image", lambda path: pygame.Surface((TILE_SIZE, TILE_SIZE))
+    )
+    farm = SimpleNamespace(
+        width=4, height=4, mask=lambda name: np.ones((4, 4), dtype=bool)
+    )
+    return SoilLayer(
+        pygame.sprite.Group(), pygame.sprite.Group(), farm, ToolTargets()
+    )
+
+
+def test_untill_removes_water_and_plant(soil_layer):
+    point = (TILE_SIZE + 5, TILE_SIZE + 5)
+    soil_layer.get_hit(point)
+    soil_layer.water(point)
+    soil_layer.plant_seed(point, "corn")
+    for flag in (TILLED, WATERED, PLANTED):
+        assert soil_layer.grid.has(1, 1, flag)
+
+    soil_layer.untill(1, 1)
+
+    assert not soil_layer.grid.has(1, 1, TILLED | WATERED | PLANTED)
+    assert not soil_layer.crops.planted()[1, 1]
+    assert not soil_layer.soil_sprites
+    assert not soil_layer.water_sprites
+    assert not soil_layer.plant_sprites
+    assert not soil_layer.all_sprites
+    for kind in ("soil", "water", "plant"):
+        assert not soil_layer.targets.in_cell(kind, (1, 1))
+
+    # the plant is gone from the crop store, so it does not grow any more
+    soil_layer.update_plants()
+    assert not soil_layer.crops.planted().any()
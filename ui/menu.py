@@ -1,5 +1,6 @@
 import pygame
 
+from helpers.replay import keyboard
 from helpers.settings import *
 from helpers.timer import Timer
 
@@ -112,7 +113,7 @@ class Menu:
 
     def input(self):
         """handle the input for the menu"""
-        keys = pygame.key.get_pressed()
+        keys = keyboard.pressed
         self.timer.update()
 
         if keys[pygame.K_ESCAPE]:
@@ -121,7 +122,7 @@ class Menu:
         if not self.timer.active:
             self.menu_movement(keys)
             if keys[pygame.K_SPACE]:
-                self.buy_or_sell()
+                self.buy_or_sell(keys)
 
     def highlight_entry(self, bg_rect):
         """highlight item when selected
@@ -186,7 +187,7 @@ class Menu:
             top: the top position of the item rectangle
             selected: whether the item is selected or not
         """
-        bg_rect = self.show_item(surf, top)
+        bg_rect = self.display_item(surf, top)
         self.show_amount(amount, bg_rect)
 
         if selected:
@@ -207,7 +208,10 @@ class Menu:
             )
 
     def update(self):
-        """update the menu"""
+        """handle the menu input"""
         self.input()
+
+    def display(self):
+        """draw the menu"""
         self.display_money()
-        self.display_menu_items()
+        self.display_menu_entries()
@@ -1,5 +1,6 @@
 import pygame
 
+from helpers.assets import assets
 from helpers.settings import *
 
 
@@ -10,15 +11,11 @@ class Overlay:
 
         overlay_path = "../graphics/overlay/"
         self.tools_surface = {
-            tool: pygame.image.load(
-                f"{overlay_path}{tool}.png"
-            ).convert_alpha()
+            tool: assets.image(f"{overlay_path}{tool}.png")
             for tool in player.tools
         }
         self.seeds_surface = {
-            seed: pygame.image.load(
-                f"{overlay_path}{seed}.png"
-            ).convert_alpha()
+            seed: assets.image(f"{overlay_path}{seed}.png")
             for seed in player.seeds
         }
 
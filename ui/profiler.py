@@ -0,0 +1,172 @@
+import json
+from collections import defaultdict, deque
+
+import pygame
+
+from helpers.assets import assets
+from helpers.profiler import profiler
+from helpers.settings import *
+from objects.sprites import fruit_pool, particle_pool
+
+WHITE = (255, 255, 255)
+COLUMN_GAP = 16  # pixels between the columns of the overlay
+
+# profiler sections shown in the overlay, in the order of a frame
+STAGES = {
+    "all_sprites.update": "sprite update",
+    "plant_collision": "plant collision",
+    "rain.update": "rain",
+    "transition.update": "transition",
+    "custom_draw": "camera draw",
+    "sky.display": "sky",
+}
+
+
+def cache_stats():
+    """get the counters of the asset cache and the sprite pools
+
+    Returns:
+        dict: hits, misses and size per cache
+    """
+    return {
+        "assets": assets.stats(),
+        "particle_pool": particle_pool.stats(),
+        "fruit_pool": fruit_pool.stats(),
+    }
+
+
+class ProfilerOverlay:
+    """debug overlay with rolling timings of the frame stages, sprite counts and cache hits
+
+    While it is shown, every frame is also written to PROFILER_LOG as a line of json.
+    """
+
+    def __init__(self, level) -> None:
+        self.display_surface = pygame.display.get_surface()
+        self.level = level
+        self.font = pygame.font.Font("../font/LycheeSoda.ttf", 20)
+        self.active = False
+        self.log = None
+        self.frame = 0
+        self.timings = defaultdict(lambda: deque(maxlen=PROFILER_WINDOW))
+        self.rows = []
+        self.widths = []
+
+    def toggle(self):
+        """show or hide the overlay, the profiler only runs while it is shown"""
+        self.active = not self.active
+        profiler.enabled = self.active
+        profiler.end_frame()
+        if self.active:
+            self.log = open(PROFILER_LOG, "a")
+        else:
+            self.log.close()
+            self.log = None
+
+    def sprite_counts(self):
+        """count the sprites of the level groups
+
+        Returns:
+            dict: number of sprites per group
+        """
+        soil_layer = self.level.soil_layer
+        return {
+            "all_sprites": len(self.level.all_sprites),
+            "collision_sprites": len(self.level.collision_sprites),
+            "plant_sprites": len(soil_layer.plant_sprites),
+            "water_sprites": len(soil_layer.water_sprites),
+            "soil_sprites": len(soil_layer.soil_sprites),
+        }
+
+    def write(self, timings, counts, caches):
+        """append the frame to the log
+
+        Args:
+            timings: seconds per stage
+            counts: sprites per group
+            caches: counters per cache
+        """
+        record = {
+            "frame": self.frame,
+            "ms": {
+                name: round(seconds * 1000, 4)
+                for name, seconds in timings.items()
+            },
+            "sprites": counts,
+            "caches": caches,
+        }
+        self.log.write(json.dumps(record) + "\n")
+
+    def render_rows(self, counts, caches):
+        """render the text of the overlay, one surface per cell of the table
+
+        The font is not monospaced, so the columns are lined up when drawing.
+
+        Args:
+            counts: sprites per group
+            caches: counters per cache
+        """
+        texts = [("stage", "avg ms", "max ms")]
+        for name, label in STAGES.items():
+            samples = self.timings[name]
+            if samples:
+                texts.append(
+                    (
+                        label,
+                        f"{sum(samples) / len(samples) * 1000:.2f}",
+                        f"{max(samples) * 1000:.2f}",
+                    )
+                )
+        texts.extend((name, str(count)) for name, count in counts.items())
+        texts.append(("cache", "hits", "misses"))
+        texts.extend(
+            (name, str(stats["hits"]), str(stats["misses"]))
+            for name, stats in caches.items()
+        )
+        self.rows = [
+            [self.font.render(text, False, WHITE) for text in row]
+            for row in texts
+        ]
+        self.widths = [
+            max(row[col].get_width() for row in self.rows if col < len(row))
+            for col in range(max(len(row) for row in self.rows))
+        ]
+
+    def display(self):
+        """collect the timings of the frame and draw the overlay"""
+        if not self.active:
+            return
+
+        # frames drawn without a simulation tick have no update timings, they are skipped
+        timings = profiler.end_frame()
+        for name, seconds in timings.items():
+            if name in STAGES:
+                self.timings[name].append(seconds)
+        counts = self.sprite_counts()
+        caches = cache_stats()
+        self.write(timings, counts, caches)
+
+        # the text is only rendered every few frames, it would cost more than it shows
+        if self.frame % PROFILER_REFRESH == 0:
+            self.render_rows(counts, caches)
+        self.frame += 1
+
+        height = sum(
+            max(cell.get_height() for cell in row) for row in self.rows
+        )
+        width = sum(self.widths) + COLUMN_GAP * (len(self.widths) - 1)
+        background = pygame.Rect(
+            SCREEN_WIDTH - width - 30, 10, width + 20, height + 20
+        )
+        pygame.draw.rect(self.display_surface, (0, 0, 0), background, 0, 6)
+        top = background.top + 10
+        for row in self.rows:
+            left = background.left + 10
+            for col, cell in enumerate(row):
+                # labels are aligned to the left, numbers to the right
+                x = left
+                if col:
+                    x += self.widths[col] - cell.get_width()
+                self.display_surface.blit(cell, (x, top))
+                left += self.widths[col] + COLUMN_GAP
+            top += max(cell.get_height() for cell in row)
@@ -22,7 +22,7 @@ class Enemy(Entity):
         self.animations = import_folder("../graphics/cow/")
         # print(self.animations)
         self.status = "idle"
-        self.image = self.animations[self.frame_index]
+        self.image = self.clock.frame(self.animations)
         self.rect = self.image.get_rect(topleft=pos)
         self.hitbox = self.rect.inflate(0, -10)
         self.obstacle_sprites = obstacle_sprites
@@ -50,12 +50,10 @@ class Enemy(Entity):
             self.status = "idle"
 
     def animate(self):
-        self.frame_index += self.animation_speed
-        if self.frame_index >= len(self.animations[self.status]):
-            if self.status == "attack":
-                self.can_attack = False
-            self.frame_index = 0
-        self.image = self.animations[self.status][int(self.frame_index)]
+        frames = self.animations[self.status]
+        if self.clock.advance(1, len(frames)) and self.status == "attack":
+            self.can_attack = False
+        self.image = self.clock.frame(frames)
         self.rect = self.image.get_rect(center=self.hitbox.center)
 
         self.flicker()
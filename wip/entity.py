@@ -1,14 +1,14 @@
 from math import sin
 
 import pygame
+from helpers.animation import AnimationClock
 from helpers.logic import update_cooldown
 
 
 class Entity(pygame.sprite.Sprite):
     def __init__(self, groups) -> None:
         super().__init__(groups)
-        self.frame_index = 0
-        self.animation_speed = 0.15
+        self.clock = AnimationClock(0.15)  # frames per update
         self.direction = pygame.math.Vector2(0, 0)
 
     def collide(self, direction):